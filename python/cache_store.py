@@ -0,0 +1,267 @@
+import contextlib
+import hashlib
+import os
+import shutil
+import sqlite3
+import time
+
+# Bump when the layout or schema changes; older stores are discarded on open
+STORE_VERSION = 2
+DEFAULT_QUOTA = 2 * 1024 * 1024 * 1024
+HASH_CHUNK_SIZE = 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    project TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (project, kind, digest)
+);
+CREATE TABLE IF NOT EXISTS files (
+    project TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    path TEXT NOT NULL,
+    object TEXT,
+    link TEXT,
+    PRIMARY KEY (project, kind, digest, path)
+);
+CREATE TABLE IF NOT EXISTS objects (
+    object TEXT PRIMARY KEY,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_object ON files (object);
+CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used);
+"""
+
+
+def project_key(project_path):
+    path = os.path.abspath(project_path)
+    return f"{os.path.basename(path)}-{hashlib.sha256(path.encode()).hexdigest()[:10]}"
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def walk_paths(root, paths):
+    # Yields (relative path, absolute path) for every file and symlink below paths
+    for path in paths:
+        full = os.path.join(root, path)
+        if os.path.islink(full) or os.path.isfile(full):
+            yield path, full
+        elif os.path.isdir(full):
+            for dirpath, dirnames, filenames in os.walk(full):
+                for name in filenames + [d for d in dirnames if os.path.islink(os.path.join(dirpath, d))]:
+                    absolute = os.path.join(dirpath, name)
+                    yield os.path.relpath(absolute, root).replace(os.sep, '/'), absolute
+
+
+class CacheStore:
+    # Content-addressed store shared by all projects. File contents live once
+    # under objects/, each (project, kind, digest) entry is a tree of hardlinks
+    # to them under entries/, and index.db tracks sizes and last use for LRU
+    # eviction under the disk quota.
+    def __init__(self, root, quota=DEFAULT_QUOTA):
+        self.root = root
+        self.quota = quota
+        self.objects_dir = os.path.join(root, 'objects')
+        self.entries_dir = os.path.join(root, 'entries')
+        os.makedirs(root, exist_ok=True)
+        self.db = sqlite3.connect(os.path.join(root, 'index.db'), timeout=30, isolation_level=None)
+        if self.db.execute('PRAGMA user_version').fetchone()[0] != STORE_VERSION:
+            self.reset()
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.entries_dir, exist_ok=True)
+
+    def reset(self):
+        self.db.executescript(
+            'DROP TABLE IF EXISTS entries; DROP TABLE IF EXISTS files; DROP TABLE IF EXISTS objects;'
+        )
+        shutil.rmtree(self.objects_dir, ignore_errors=True)
+        shutil.rmtree(self.entries_dir, ignore_errors=True)
+        self.db.executescript(SCHEMA)
+        self.db.execute(f'PRAGMA user_version = {STORE_VERSION}')
+
+    def close(self):
+        self.db.close()
+
+    @contextlib.contextmanager
+    def transaction(self):
+        self.db.execute('BEGIN IMMEDIATE')
+        try:
+            yield
+        except BaseException:
+            self.db.execute('ROLLBACK')
+            raise
+        self.db.execute('COMMIT')
+
+    def object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def entry_dir(self, project, kind, digest):
+        return os.path.join(self.entries_dir, project, kind, digest)
+
+    def has(self, project, kind, digest):
+        row = self.db.execute(
+            'SELECT 1 FROM entries WHERE project = ? AND kind = ? AND digest = ?', (project, kind, digest)
+        ).fetchone()
+        return row is not None
+
+    def touch(self, project, kind, digest):
+        self.db.execute(
+            'UPDATE entries SET last_used = ? WHERE project = ? AND kind = ? AND digest = ?',
+            (time.time(), project, kind, digest)
+        )
+
+    def store_object(self, source):
+        digest = file_digest(source)
+        target = self.object_path(digest)
+        if not os.path.exists(target):
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            staging = f"{target}.{os.getpid()}.tmp"
+            shutil.copy2(source, staging)
+            os.replace(staging, target)
+        self.db.execute('INSERT OR IGNORE INTO objects (object, size) VALUES (?, ?)',
+                        (digest, os.path.getsize(target)))
+        return digest
+
+    def link_object(self, digest, target):
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        try:
+            os.link(self.object_path(digest), target)
+        except OSError:
+            # Filesystems without hardlinks still work, just without the dedup
+            shutil.copy2(self.object_path(digest), target)
+
+    def put(self, project, kind, digest, source_root, paths):
+        files = []
+        for relative, absolute in walk_paths(source_root, paths):
+            if os.path.islink(absolute):
+                files.append((relative, None, os.readlink(absolute)))
+            else:
+                files.append((relative, self.store_object(absolute), None))
+        self.add_entry(project, kind, digest, files)
+
+    def add_entry(self, project, kind, digest, files):
+        entry = self.entry_dir(project, kind, digest)
+        staging = f"{entry}.{os.getpid()}.tmp"
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+        size = 0
+        for relative, obj, link in files:
+            target = os.path.join(staging, relative)
+            if link is not None:
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                os.symlink(link, target)
+            else:
+                self.link_object(obj, target)
+                size += os.path.getsize(target)
+        shutil.rmtree(entry, ignore_errors=True)
+        os.replace(staging, entry)
+        now = time.time()
+        with self.transaction():
+            self.db.execute('DELETE FROM files WHERE project = ? AND kind = ? AND digest = ?', (project, kind, digest))
+            self.db.executemany(
+                'INSERT INTO files (project, kind, digest, path, object, link) VALUES (?, ?, ?, ?, ?, ?)',
+                [(project, kind, digest, relative, obj, link) for relative, obj, link in files]
+            )
+            self.db.execute(
+                'INSERT OR REPLACE INTO entries (project, kind, digest, size, created_at, last_used) VALUES (?, ?, ?, ?, ?, ?)',
+                (project, kind, digest, size, now, now)
+            )
+
+    def restore(self, project, kind, digest, dest_root, paths):
+        # Copies the files below paths back into dest_root. Copies rather than
+        # links, so builds that edit restored files cannot corrupt the store.
+        # Only the project's own entry is used: artifacts such as
+        # package_config.json name the root package, so projects with
+        # identical lockfiles share file contents but never whole entries.
+        if not self.has(project, kind, digest):
+            return False
+        files = self.db.execute(
+            'SELECT path, object, link FROM files WHERE project = ? AND kind = ? AND digest = ?', (project, kind, digest)
+        ).fetchall()
+        prefixes = tuple(path.rstrip('/') for path in paths)
+        for relative, obj, link in files:
+            if not any(relative == prefix or relative.startswith(prefix + '/') for prefix in prefixes):
+                continue
+            target = os.path.join(dest_root, relative)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            if link is not None:
+                if not os.path.lexists(target):
+                    os.symlink(link, target)
+            else:
+                shutil.copy2(self.object_path(obj), target)
+        self.touch(project, kind, digest)
+        return True
+
+    def disk_usage(self):
+        return self.db.execute('SELECT COALESCE(SUM(size), 0) FROM objects').fetchone()[0]
+
+    def remove_entry(self, project, kind, digest):
+        with self.transaction():
+            self.db.execute('DELETE FROM files WHERE project = ? AND kind = ? AND digest = ?', (project, kind, digest))
+            self.db.execute('DELETE FROM entries WHERE project = ? AND kind = ? AND digest = ?', (project, kind, digest))
+        shutil.rmtree(self.entry_dir(project, kind, digest), ignore_errors=True)
+
+    def collect_garbage(self):
+        orphans = self.db.execute(
+            'SELECT object, size FROM objects WHERE object NOT IN (SELECT object FROM files WHERE object IS NOT NULL)'
+        ).fetchall()
+        for obj, _ in orphans:
+            try:
+                os.remove(self.object_path(obj))
+            except FileNotFoundError:
+                pass
+        with self.transaction():
+            self.db.executemany('DELETE FROM objects WHERE object = ?', [(obj,) for obj, _ in orphans])
+        return sum(size for _, size in orphans)
+
+    def prune(self, quota=None, max_age=None):
+        # Drops entries unused for max_age seconds, then least recently used
+        # entries until the objects fit in the quota. Returns the evicted entries.
+        quota = self.quota if quota is None else quota
+        evicted = []
+        if max_age is not None:
+            for project, kind, digest in self.db.execute(
+                'SELECT project, kind, digest FROM entries WHERE last_used < ?', (time.time() - max_age,)
+            ).fetchall():
+                self.remove_entry(project, kind, digest)
+                evicted.append((project, kind, digest))
+            self.collect_garbage()
+        while quota is not None and self.disk_usage() > quota:
+            row = self.db.execute('SELECT project, kind, digest FROM entries ORDER BY last_used LIMIT 1').fetchone()
+            if row is None:
+                break
+            self.remove_entry(*row)
+            evicted.append(row)
+            self.collect_garbage()
+        return evicted
+
+    def stats(self):
+        entries, projects, logical = self.db.execute(
+            'SELECT COUNT(*), COUNT(DISTINCT project), COALESCE(SUM(size), 0) FROM entries'
+        ).fetchone()
+        objects = self.db.execute('SELECT COUNT(*) FROM objects').fetchone()[0]
+        kinds = dict(self.db.execute('SELECT kind, COUNT(*) FROM entries GROUP BY kind').fetchall())
+        oldest = self.db.execute('SELECT MIN(last_used) FROM entries').fetchone()[0]
+        return {
+            'root': self.root,
+            'version': STORE_VERSION,
+            'entries': entries,
+            'projects': projects,
+            'kinds': kinds,
+            'objects': objects,
+            'logical_bytes': logical,
+            'disk_bytes': self.disk_usage(),
+            'quota_bytes': self.quota,
+            'oldest_use': oldest,
+        }
@@ -0,0 +1,183 @@
+import contextvars
+import json
+import os
+import signal
+import subprocess
+import time
+from collections import deque
+
+ASYNC_LINE_LIMIT = 1024 * 1024
+
+command_records = []
+current_stage = contextvars.ContextVar('command_stage', default='main')
+
+
+class OutputBuffer:
+    # Collects output as a list of chunks joined once at the end. With
+    # tail_lines set only the last lines are kept, so memory stays bounded.
+    def __init__(self, tail_lines=None):
+        self.chunks = deque(maxlen=tail_lines) if tail_lines else []
+        self.line_count = 0
+        self.byte_count = 0
+
+    def append(self, line, size=None):
+        self.chunks.append(line)
+        self.line_count += 1
+        self.byte_count += len(line.encode('utf-8', errors='replace')) if size is None else size
+
+    def getvalue(self):
+        return ''.join(self.chunks)
+
+
+def set_command_stage(stage):
+    current_stage.set(stage)
+
+
+def clear_command_records():
+    command_records.clear()
+
+
+def record_command(command, started, cpu_time, returncode, buffer):
+    record = {
+        'command': command,
+        'stage': current_stage.get(),
+        'wall_time': time.perf_counter() - started,
+        'cpu_time': cpu_time,
+        'output_bytes': buffer.byte_count,
+        'exit_code': returncode,
+    }
+    command_records.append(record)
+    return record
+
+
+def format_command_record(record):
+    cpu_time = f"{record['cpu_time']:.2f}s" if record['cpu_time'] is not None else '-'
+    return (f"[{record['stage']}] {record['wall_time']:.2f}s wall, {cpu_time} cpu, "
+            f"{record['output_bytes']} bytes, exit {record['exit_code']}: {record['command']}")
+
+
+def summarize_command_records(records=None, as_json=False):
+    records = sorted(command_records if records is None else records, key=lambda r: r['wall_time'], reverse=True)
+    stages = {}
+    for record in records:
+        stage = stages.setdefault(record['stage'], {'commands': 0, 'wall_time': 0.0})
+        stage['commands'] += 1
+        stage['wall_time'] += record['wall_time']
+    if as_json:
+        return json.dumps({'stages': stages, 'commands': records}, indent=2)
+    lines = ["Command timings (slowest first):"]
+    lines.extend('  ' + format_command_record(record) for record in records)
+    lines.append("Time per stage:")
+    for name, stage in sorted(stages.items(), key=lambda item: item[1]['wall_time'], reverse=True):
+        lines.append(f"  {name}: {stage['wall_time']:.2f}s in {stage['commands']} command(s)")
+    return '\n'.join(lines)
+
+
+def wait_with_rusage(process):
+    # wait4 reports the CPU time of this child (and the children it waited for)
+    # without mixing in commands that run concurrently
+    if not hasattr(os, 'wait4'):
+        return process.wait(), None
+    _, status, usage = os.wait4(process.pid, 0)
+    if os.WIFSIGNALED(status):
+        process.returncode = -os.WTERMSIG(status)
+    else:
+        process.returncode = os.WEXITSTATUS(status)
+    return process.returncode, usage.ru_utime + usage.ru_stime
+
+
+def stream_command(command, cwd=None, subscribers=(), tail_lines=None):
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        command,
+        cwd=cwd,
+        shell=True,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        errors='replace'
+    )
+    buffer = OutputBuffer(tail_lines)
+    with process.stdout:
+        for line in process.stdout:
+            buffer.append(line)
+            for subscriber in subscribers:
+                subscriber(line)
+    returncode, cpu_time = wait_with_rusage(process)
+    record = record_command(command, started, cpu_time, returncode, buffer)
+    return returncode, buffer, record
+
+
+def kill_process_tree(process):
+    try:
+        if os.name == 'posix':
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+async def stream_command_async(command, cwd=None, subscribers=(), tail_lines=None, timeout=None):
+    import asyncio
+    import locale
+    started = time.perf_counter()
+    process = await asyncio.create_subprocess_shell(
+        command,
+        cwd=cwd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT,
+        limit=ASYNC_LINE_LIMIT,
+        # Own process group so a timeout or cancellation also stops the shell's children
+        start_new_session=os.name == 'posix'
+    )
+    buffer = OutputBuffer(tail_lines)
+    encoding = locale.getpreferredencoding(False)
+
+    async def pump():
+        while True:
+            line = await process.stdout.readline()
+            if not line:
+                break
+            text = line.decode(encoding, errors='replace').replace('\r\n', '\n')
+            buffer.append(text, len(line))
+            for subscriber in subscribers:
+                subscriber(text)
+        return await process.wait()
+
+    try:
+        returncode = await asyncio.wait_for(pump(), timeout)
+    except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+        kill_process_tree(process)
+        await process.wait()
+        # Hung commands are the ones worth seeing in the summary, so record them before re-raising
+        marker = 'timeout' if isinstance(e, asyncio.TimeoutError) else 'cancelled'
+        record_command(command, started, None, marker, buffer)
+        raise
+    # asyncio reaps the child itself, so there is no per-process rusage to report
+    record = record_command(command, started, None, returncode, buffer)
+    return returncode, buffer, record
+
+
+async def run_command_async(command, cwd=None, check=True, subscribers=(), tail_lines=None, timeout=None,
+                            semaphore=None):
+    if semaphore is None:
+        returncode, output, _ = await stream_command_async(command, cwd, subscribers, tail_lines, timeout)
+    else:
+        async with semaphore:
+            returncode, output, _ = await stream_command_async(command, cwd, subscribers, tail_lines, timeout)
+    stdout = output.getvalue()
+    if returncode != 0 and check:
+        raise subprocess.CalledProcessError(returncode, command, output=stdout)
+    return returncode, stdout
+
+
+async def gather_commands(commands, limit=4, **kwargs):
+    import asyncio
+    semaphore = asyncio.Semaphore(limit)
+    return await asyncio.gather(*(run_command_async(command, semaphore=semaphore, **kwargs) for command in commands))
+
+
+def run_commands(commands, limit=4, **kwargs):
+    import asyncio
+    return asyncio.run(gather_commands(commands, limit=limit, **kwargs))
@@ -5,18 +5,21 @@ import platform
 import argparse
 import shutil
 import os
-import textwrap
-import requests
-import zipfile
+import atexit
 import io
 import json
-import hashlib
-
+import base64
+import re
+import shlex
+import glob
+import fnmatch
+import math
+
+# requests, PyGithub, tqdm and the heavier stdlib modules are imported inside
+# the functions that use them so --help and skip paths start quickly
 from colorama import init, Fore, Style
-from termcolor import colored
-from tqdm import tqdm
 
-from github import Github, GithubException
+from command_runner import gather_commands, run_commands, set_command_stage, stream_command, summarize_command_records
 
 init(autoreset=True)
 
@@ -33,47 +36,32 @@ def print_ascii_art():
 
     rainbow_colors = [Fore.RED, Fore.YELLOW, Fore.GREEN, Fore.CYAN, Fore.BLUE, Fore.MAGENTA]
 
+    # Build the whole banner first and write it once instead of per character
+    rainbow_lines = []
     for line in ascii_art:
-        rainbow_line = ''
-        for i, char in enumerate(line):
-            if char != ' ':
-                color = rainbow_colors[i % len(rainbow_colors)]
-                rainbow_line += color + char
-            else:
-                rainbow_line += ' '
-        print(rainbow_line + Style.RESET_ALL)
+        rainbow_lines.append(''.join(
+            rainbow_colors[i % len(rainbow_colors)] + char if char != ' ' else ' '
+            for i, char in enumerate(line)
+        ) + Style.RESET_ALL)
+    print('\n'.join(rainbow_lines) + '\n\n')
 
-    print('\n')
 
-
-def run_command(command, cwd=None, verbose=True, check=True, use_tqdm=False):
-    if verbose:
+def run_command(command, cwd=None, verbose=True, check=True, use_tqdm=False, capture_only=False,
+                tail_lines=None, on_line=None):
+    from tqdm import tqdm
+    if verbose and not capture_only:
         print(Fore.LIGHTBLUE_EX + f"➤ Running command: {command}")
-    try:
-        process = subprocess.Popen(
-            command,
-            cwd=cwd,
-            shell=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            text=True
-        )
-        stdout = ''
+    subscribers = [on_line] if on_line else []
+    progress = None
+    if not capture_only:
         if use_tqdm:
-            for line in tqdm(iter(process.stdout.readline, ''), desc=command, unit='line'):
-                if line:
-                    stdout += line
-                    if verbose:
-                        print(Fore.WHITE + line.strip())
-        else:
-            while True:
-                line = process.stdout.readline()
-                if not line:
-                    break
-                stdout += line
-                if verbose:
-                    print(Fore.WHITE + line.strip())
-        returncode = process.wait()
+            progress = tqdm(desc=command, unit='line')
+            subscribers.append(lambda line: progress.update(1))
+        if verbose:
+            subscribers.append(lambda line: print(Fore.WHITE + line.strip()))
+    try:
+        returncode, output, _ = stream_command(command, cwd=cwd, subscribers=subscribers, tail_lines=tail_lines)
+        stdout = output.getvalue()
         if returncode != 0 and check:
             print(Fore.RED + f"Command '{command}' failed with return code {returncode}.")
             sys.exit(1)
@@ -84,6 +72,9 @@ def run_command(command, cwd=None, verbose=True, check=True, use_tqdm=False):
             sys.exit(1)
         else:
             return e.returncode, e.output, ''
+    finally:
+        if progress is not None:
+            progress.close()
 
 
 def open_new_window_and_run(command):
@@ -96,33 +87,68 @@ def open_new_window_and_run(command):
         subprocess.run(f'{command}', shell=True)
 
 
-def install_python_packages(package_versions=None, verbose=False):
-    required_packages = {
-        'PyGithub': 'PyGithub',
-        'requests': 'requests',
-        'colorama': 'colorama',
-        'termcolor': 'termcolor',
-        'tqdm': 'tqdm'
-    }
+# Distribution name -> pip requirement
+REQUIRED_PYTHON_PACKAGES = {
+    'PyGithub': 'PyGithub',
+    'requests': 'requests',
+    'colorama': 'colorama',
+    'termcolor': 'termcolor',
+    'tqdm': 'tqdm',
+    'PyYAML': 'PyYAML'
+}
+# Used for frozen builds, which usually ship without distribution metadata
+IMPORT_NAMES = {
+    'PyGithub': 'github',
+    'PyYAML': 'yaml'
+}
+# Set in the environment of a process relaunched after installing packages
+RELAUNCH_ENV = 'FLUTTER_GITHUB_MANAGER_RELAUNCHED'
+
+
+def is_python_package_installed(distribution):
+    import importlib.metadata
+    import importlib.util
+    try:
+        importlib.metadata.distribution(distribution)
+        return True
+    except importlib.metadata.PackageNotFoundError:
+        pass
+    if getattr(sys, 'frozen', False):
+        return importlib.util.find_spec(IMPORT_NAMES.get(distribution, distribution)) is not None
+    return False
+
+
+def find_missing_python_packages(package_versions=None):
+    required_packages = dict(REQUIRED_PYTHON_PACKAGES)
     if package_versions:
         required_packages.update(package_versions)
-    for package, spec in required_packages.items():
-        try:
-            __import__(package)
-        except ImportError:
-            print(Fore.YELLOW + f"Installing missing Python package: {package}")
-            if sys.argv[0].endswith('.exe'):
-                print(Fore.YELLOW + f"Running as .exe. Opening new Python window to install {package}...")
-                python_path = shutil.which("python") or "python"
-                open_new_window_and_run(f'{python_path} -m pip install {spec}')
-                print(Fore.YELLOW + "Relaunching the script with the same arguments...")
-                subprocess.run([sys.executable] + sys.argv)
-                sys.exit(0)
-            else:
-                run_command(f"{sys.executable} -m pip install {spec}", verbose=verbose)
+    return {package: spec for package, spec in required_packages.items() if not is_python_package_installed(package)}
+
+
+def install_python_packages(package_versions=None, verbose=False, missing=None):
+    if missing is None:
+        missing = find_missing_python_packages(package_versions)
+    if not missing:
+        return
+    specs = ' '.join(f'"{spec}"' for spec in missing.values())
+    print(Fore.YELLOW + f"Installing missing Python packages: {', '.join(missing)}")
+    if sys.argv[0].endswith('.exe'):
+        if os.environ.get(RELAUNCH_ENV):
+            # Relaunch at most once; the pip window may still be running or may have failed
+            print(Fore.RED + f"Python packages are still missing after relaunching: {', '.join(missing)}")
+            print(Fore.RED + f"Install them with 'python -m pip install {specs}' and run the tool again.")
+            sys.exit(1)
+        print(Fore.YELLOW + "Running as .exe. Opening new Python window to install the packages...")
+        python_path = shutil.which("python") or "python"
+        open_new_window_and_run(f'{python_path} -m pip install {specs}')
+        print(Fore.YELLOW + "Relaunching the script with the same arguments...")
+        result = subprocess.run([sys.executable] + sys.argv, env={**os.environ, RELAUNCH_ENV: '1'})
+        sys.exit(result.returncode)
+    else:
+        run_command(f"{sys.executable} -m pip install {specs}", verbose=verbose)
 
 
-def install_with_chocolatey(package, verbose=False):
+def install_with_chocolatey(packages, verbose=False):
     try:
         subprocess.run(
             "choco -v",
@@ -136,20 +162,20 @@ def install_with_chocolatey(package, verbose=False):
         print(Fore.RED + "Chocolatey is not installed. Please install Chocolatey.")
         sys.exit(1)
 
-    print(Fore.YELLOW + f"Installing {package} with Chocolatey...")
-    run_command(f"choco install {package} -y", verbose=verbose)
+    print(Fore.YELLOW + f"Installing {', '.join(packages)} with Chocolatey...")
+    run_command(f"choco install {' '.join(packages)} -y", verbose=verbose)
 
 
-def install_with_apt(package, verbose=False):
+def install_with_apt(packages, verbose=False):
     try:
         run_command("sudo apt-get update", verbose=verbose)
-        run_command(f"sudo apt-get install -y {package}", verbose=verbose)
+        run_command(f"sudo apt-get install -y {' '.join(packages)}", verbose=verbose)
     except:
-        print(Fore.RED + f"Error installing {package} with apt. Please install manually.")
+        print(Fore.RED + f"Error installing {', '.join(packages)} with apt. Please install manually.")
         sys.exit(1)
 
 
-def install_with_homebrew(package, verbose=False):
+def install_with_homebrew(packages, verbose=False):
     try:
         subprocess.run(
             "brew --version",
@@ -163,49 +189,25 @@ def install_with_homebrew(package, verbose=False):
         print(Fore.RED + "Homebrew is not installed. Please install Homebrew.")
         sys.exit(1)
 
-    print(Fore.YELLOW + f"Installing {package} with Homebrew...")
-    run_command(f"brew install {package}", verbose=verbose)
+    print(Fore.YELLOW + f"Installing {', '.join(packages)} with Homebrew...")
+    run_command(f"brew install {' '.join(packages)}", verbose=verbose)
 
 
-def install_git(verbose=False):
+def install_system_packages(packages, verbose=False):
+    # One transaction per package manager: a single update plus a single install
     current_os = platform.system()
     if current_os == "Windows":
-        install_with_chocolatey("git", verbose=verbose)
+        install_with_chocolatey(packages, verbose=verbose)
     elif current_os == "Linux":
-        install_with_apt("git", verbose=verbose)
+        install_with_apt(packages, verbose=verbose)
     elif current_os == "Darwin":
-        install_with_homebrew("git", verbose=verbose)
+        install_with_homebrew(packages, verbose=verbose)
     else:
-        print(Fore.RED + "Git installation not supported automatically. Install manually.")
+        print(Fore.RED + f"Installing {', '.join(packages)} not supported automatically. Install manually.")
         sys.exit(1)
 
 
-def check_and_install_git(verbose=False):
-    try:
-        returncode, stdout, _ = run_command("git --version", verbose=verbose, check=False)
-        if returncode == 0:
-            print(Fore.GREEN + "Git is installed.")
-            return
-    except:
-        pass
-    print(Fore.YELLOW + "Git is not installed. Installing now...")
-    install_git(verbose=verbose)
-    run_command("git --version", verbose=verbose)
-
-
-def install_gh(verbose=False):
-    current_os = platform.system()
-    if current_os == "Windows":
-        install_with_chocolatey("gh", verbose=verbose)
-    elif current_os == "Linux":
-        install_with_apt("gh", verbose=verbose)
-    elif current_os == "Darwin":
-        install_with_homebrew("gh", verbose=verbose)
-    else:
-        print(Fore.RED + "Installing GitHub CLI not supported automatically. Install manually.")
-        sys.exit(1)
-
-    print(Fore.YELLOW + "GitHub CLI (gh) installed. Opening new window for `gh auth login`...")
+def gh_auth_login(verbose=False):
     if platform.system() == "Windows":
         open_new_window_and_run('gh auth login')
         open_new_window_and_run('gh auth setup-git')
@@ -214,25 +216,54 @@ def install_gh(verbose=False):
         run_command("gh auth setup-git", verbose=verbose)
 
 
-def check_and_install_gh(verbose=False):
-    try:
-        returncode, stdout, _ = run_command("gh --version", verbose=verbose, check=False)
-        if returncode == 0:
-            print(Fore.GREEN + "GitHub CLI (gh) is installed.")
-            _, auth_status, _ = run_command("gh auth status", verbose=verbose, check=False)
-            if "not logged into any GitHub hosts" in auth_status:
-                print(Fore.YELLOW + "GitHub CLI not authenticated. Please authenticate.")
-                if platform.system() == "Windows":
-                    open_new_window_and_run('gh auth login')
-                    open_new_window_and_run('gh auth setup-git')
-                else:
-                    run_command("gh auth login", verbose=verbose)
-                    run_command("gh auth setup-git", verbose=verbose)
-            return
-    except:
-        pass
-    print(Fore.YELLOW + "GitHub CLI (gh) not installed.")
-    install_gh(verbose=verbose)
+async def probe_toolchain(package_versions=None, verbose=False):
+    import asyncio
+    loop = asyncio.get_running_loop()
+    # Python packages are checked in-process on a worker thread while the CLI probes run
+    missing_python = loop.run_in_executor(None, find_missing_python_packages, package_versions)
+    git_probe, gh_probe, auth_probe = await gather_commands(
+        ["git --version", "gh --version", "gh auth status"], limit=3, check=False
+    )
+    plan = {'system': [], 'gh_login': False, 'python': await missing_python}
+    if git_probe[0] == 0:
+        print(Fore.GREEN + "Git is installed.")
+    else:
+        print(Fore.YELLOW + "Git is not installed.")
+        plan['system'].append('git')
+    if gh_probe[0] == 0:
+        print(Fore.GREEN + "GitHub CLI (gh) is installed.")
+        if "not logged into any GitHub hosts" in auth_probe[1]:
+            print(Fore.YELLOW + "GitHub CLI not authenticated. Please authenticate.")
+            plan['gh_login'] = True
+    else:
+        print(Fore.YELLOW + "GitHub CLI (gh) not installed.")
+        plan['system'].append('gh')
+    if verbose:
+        for command, (returncode, stdout) in zip(("git --version", "gh --version", "gh auth status"), (git_probe, gh_probe, auth_probe)):
+            print(Fore.CYAN + f"{command} -> {returncode}: {stdout.strip()}")
+    return plan
+
+
+def plan_dependency_installation(package_versions=None, verbose=False):
+    import asyncio
+    return asyncio.run(probe_toolchain(package_versions, verbose=verbose))
+
+
+def execute_install_plan(plan, verbose=False):
+    if not plan['system'] and not plan['gh_login'] and not plan['python']:
+        print(Fore.GREEN + "All dependencies are installed.")
+        return
+    if plan['system']:
+        install_system_packages(plan['system'], verbose=verbose)
+    if 'git' in plan['system']:
+        run_command("git --version", verbose=verbose)
+    if 'gh' in plan['system']:
+        print(Fore.YELLOW + "GitHub CLI (gh) installed. Opening new window for `gh auth login`...")
+        gh_auth_login(verbose=verbose)
+    elif plan['gh_login']:
+        gh_auth_login(verbose=verbose)
+    if plan['python']:
+        install_python_packages(verbose=verbose, missing=plan['python'])
 
 
 def get_github_token(args):
@@ -246,6 +277,7 @@ def get_github_token(args):
 
 
 def create_repo(repo_name, github_token, verbose=False):
+    from github import Github, GithubException
     g = Github(github_token)
     user = g.get_user()
 
@@ -276,11 +308,364 @@ def create_repo(repo_name, github_token, verbose=False):
         sys.exit(1)
 
 
+GIT_OUTPUT_TAIL_LINES = 200
+GIT_PUSH_CONCURRENCY = 4
+
+
+class SubprocessGitBackend:
+    name = 'subprocess'
+
+    def __init__(self, project_path, verbose=False):
+        self.project_path = project_path
+        self.verbose = verbose
+
+    def run(self, command, check=True, tail_lines=None):
+        return run_command(command, cwd=self.project_path, verbose=self.verbose, check=check, tail_lines=tail_lines)
+
+    def init(self):
+        self.run("git init")
+
+    def add_remote(self, name, url):
+        self.run(f"git remote add {name} {url}", check=False)
+
+    def remove_cached(self, pattern):
+        self.run(f"git rm -r --cached {shlex.quote(pattern)}", check=False)
+
+    def add(self, pathspecs):
+        pathspec_str = ' '.join(shlex.quote(spec) for spec in pathspecs)
+        if len(pathspec_str) > 4000:
+            # Long file lists would overflow the command line, hand them to git via a file
+            pathspec_file = os.path.join(self.project_path, '.git', 'upload-pathspecs')
+            with open(pathspec_file, 'w', encoding='utf-8') as f:
+                f.write('\n'.join(pathspecs) + '\n')
+            self.run("git add --pathspec-from-file=.git/upload-pathspecs", tail_lines=GIT_OUTPUT_TAIL_LINES)
+        else:
+            self.run(f"git add {pathspec_str}", tail_lines=GIT_OUTPUT_TAIL_LINES)
+
+    def staged_blobs(self):
+        _, stdout, _ = run_command("git ls-files -s -z", cwd=self.project_path, capture_only=True)
+        blobs = {}
+        for entry in stdout.split('\0'):
+            if not entry:
+                continue
+            meta, path = entry.split('\t', 1)
+            mode, blob_hash, _ = meta.split(' ')
+            # Skip submodules and symlinks, only regular files carry content
+            if mode.startswith('100'):
+                blobs[path] = blob_hash
+        return blobs
+
+    def commit(self, message):
+        returncode, stdout, _ = self.run(f'git commit -m "{message}"', check=False)
+        commit_output = stdout.lower() if stdout else ''
+        if returncode == 0:
+            return True
+        if "nothing to commit" in commit_output or "working tree clean" in commit_output:
+            return False
+        print(Fore.RED + f"Error during git commit:\n{stdout}")
+        sys.exit(1)
+
+    def rename_branch(self, branch):
+        self.run(f"git branch -M {branch}")
+
+    def committed_file(self, path, revision='HEAD'):
+        # Content of path at revision, or None when either does not exist
+        returncode, stdout, _ = run_command(f"git show {shlex.quote(f'{revision}:{path}')}", cwd=self.project_path,
+                                            check=False, capture_only=True)
+        return stdout if returncode == 0 else None
+
+    def track_lfs(self, paths):
+        quoted = ' '.join(shlex.quote(path) for path in paths)
+        self.run("git lfs install --local")
+        # Re-stage so the LFS clean filter replaces the blobs with pointers
+        self.run(f"git rm -q --cached -- {quoted}")
+        self.run(f"git add .gitattributes {quoted}")
+
+    def push(self, remote=None, branch=None, force=False, set_upstream=False):
+        command = "git push"
+        if set_upstream:
+            command += " -u"
+        if remote:
+            command += f" {remote}"
+        if branch:
+            command += f" {branch}"
+        if force:
+            command += " -f"
+        self.run(command, tail_lines=GIT_OUTPUT_TAIL_LINES)
+
+    def push_all(self, remotes, branch, force=False):
+        if len(remotes) == 1:
+            try:
+                self.push(remotes[0], branch, force=force, set_upstream=True)
+            except SystemExit:
+                return remotes
+            return []
+        # Concurrent pushes would race on .git/config with -u, so the upstream is set once afterwards
+        commands = [f"git push {remote} {branch}" + (" -f" if force else "") for remote in remotes]
+        if self.verbose:
+            for command in commands:
+                print(Fore.LIGHTBLUE_EX + f"➤ Running command: {command}")
+        results = run_commands(commands, cwd=self.project_path, check=False, tail_lines=GIT_OUTPUT_TAIL_LINES,
+                               limit=GIT_PUSH_CONCURRENCY)
+        failed = []
+        for remote, (returncode, stdout) in zip(remotes, results):
+            if returncode != 0:
+                print(Fore.RED + f"Push to '{remote}' failed with return code {returncode}:\n{stdout}")
+                failed.append(remote)
+            elif self.verbose:
+                print(Fore.WHITE + stdout.strip())
+        if not failed:
+            self.run(f"git branch --set-upstream-to={remotes[-1]}/{branch} {branch}", check=False)
+        return failed
+
+
+class DulwichGitBackend(SubprocessGitBackend):
+    # Stages, commits and moves refs in-process. Pushing still goes through the
+    # git CLI so credential helpers (gh auth setup-git) and push protection
+    # messages keep working.
+    name = 'dulwich'
+
+    def __init__(self, project_path, verbose=False):
+        super().__init__(project_path, verbose=verbose)
+        try:
+            from dulwich import porcelain
+            from dulwich.repo import Repo
+        except ImportError:
+            print(Fore.RED + "The dulwich git backend requires the 'dulwich' package (pip install dulwich).")
+            sys.exit(1)
+        self.porcelain = porcelain
+        self.Repo = Repo
+        self.root = os.path.abspath(project_path)
+        self.repo = Repo(self.root) if os.path.isdir(os.path.join(self.root, '.git')) else None
+
+    def init(self):
+        self.repo = self.Repo.init(self.root)
+
+    def add_remote(self, name, url):
+        config = self.repo.get_config()
+        section = (b'remote', name.encode())
+        if config.has_section(section):
+            return
+        config.set(section, b'url', url.encode())
+        config.set(section, b'fetch', f'+refs/heads/*:refs/remotes/{name}/*'.encode())
+        config.write_to_path()
+
+    def matches(self, path, pattern):
+        pattern = pattern.strip('/').replace(os.sep, '/')
+        return pattern in ('', '.') or path == pattern or path.startswith(pattern + '/') or fnmatch.fnmatch(path, pattern)
+
+    def remove_cached(self, pattern):
+        index = self.repo.open_index()
+        for path in list(index):
+            if self.matches(path.decode('utf-8', errors='surrogateescape'), pattern):
+                del index[path]
+        index.write()
+
+    def add(self, pathspecs):
+        paths = []
+        for spec in pathspecs:
+            matches = glob.glob(os.path.join(self.root, spec))
+            paths.extend(matches or [os.path.join(self.root, spec)])
+        if pathspecs == ['.']:
+            self.porcelain.add(self.repo)
+        else:
+            self.porcelain.add(self.repo, paths=paths)
+        # git add also stages deletions of tracked files
+        index = self.repo.open_index()
+        removed = False
+        for path in list(index):
+            rel_path = path.decode('utf-8', errors='surrogateescape')
+            if any(self.matches(rel_path, spec) for spec in pathspecs) and not os.path.lexists(os.path.join(self.root, rel_path)):
+                del index[path]
+                removed = True
+        if removed:
+            index.write()
+
+    def staged_blobs(self):
+        blobs = {}
+        for path, entry in self.repo.open_index().items():
+            mode = getattr(entry, 'mode', 0)
+            if mode & 0o170000 == 0o100000:
+                blobs[path.decode('utf-8', errors='surrogateescape')] = entry.sha.decode('ascii')
+        return blobs
+
+    def commit(self, message):
+        tree = self.repo.open_index().commit(self.repo.object_store)
+        try:
+            if self.repo[self.repo.head()].tree == tree:
+                return False
+        except KeyError:
+            pass
+        self.porcelain.commit(self.repo, message=message)
+        return True
+
+    def rename_branch(self, branch):
+        new_ref = f'refs/heads/{branch}'.encode()
+        head = self.repo.refs.read_ref(b'HEAD')
+        old_ref = head[len(b'ref: '):] if head and head.startswith(b'ref: ') else None
+        if old_ref == new_ref:
+            return
+        if old_ref and old_ref in self.repo.refs:
+            self.repo.refs[new_ref] = self.repo.refs[old_ref]
+            del self.repo.refs[old_ref]
+        self.repo.refs.set_symbolic_ref(b'HEAD', new_ref)
+
+
+ASSET_VARIANT_DIR = re.compile(r'^\d+(\.\d+)?x$')
+
+
+def load_yaml_file(path):
+    import yaml
+    with open(path, 'r', encoding='utf-8') as f:
+        return yaml.safe_load(f) or {}
+
+
+def load_pubspec(project_path):
+    return load_yaml_file(os.path.join(project_path, 'pubspec.yaml'))
+
+
+def resolve_asset_entry(project_path, entry):
+    # Mirrors Flutter's asset resolution: directory entries take their direct
+    # files, file entries take resolution variants such as 2.0x/icon.png
+    entry = entry.replace('\\', '/')
+    full_path = os.path.join(project_path, entry)
+    files = []
+    if entry.endswith('/') or os.path.isdir(full_path):
+        if not os.path.isdir(full_path):
+            return files
+        for name in os.listdir(full_path):
+            child = os.path.join(full_path, name)
+            if os.path.isfile(child):
+                files.append(entry.rstrip('/') + '/' + name)
+            elif ASSET_VARIANT_DIR.match(name):
+                files.extend(
+                    entry.rstrip('/') + f'/{name}/{variant}'
+                    for variant in os.listdir(child) if os.path.isfile(os.path.join(child, variant))
+                )
+        return files
+    if os.path.isfile(full_path):
+        files.append(entry)
+    parent, name = os.path.split(entry)
+    parent_path = os.path.join(project_path, parent)
+    if os.path.isdir(parent_path):
+        for variant_dir in os.listdir(parent_path):
+            if ASSET_VARIANT_DIR.match(variant_dir) and os.path.isfile(os.path.join(parent_path, variant_dir, name)):
+                files.append(f"{parent}/{variant_dir}/{name}" if parent else f"{variant_dir}/{name}")
+    return files
+
+
+def compute_minimal_upload_set(project_path, platforms, verbose=False):
+    pubspec = load_pubspec(project_path)
+    flutter = pubspec.get('flutter') or {}
+    paths = ['pubspec.yaml', 'lib']
+    for optional in ('pubspec.lock', '.gitignore', '.gitattributes', 'l10n.yaml'):
+        if os.path.exists(os.path.join(project_path, optional)):
+            paths.append(optional)
+    if os.path.exists(os.path.join(project_path, 'l10n.yaml')):
+        l10n = load_yaml_file(os.path.join(project_path, 'l10n.yaml'))
+        arb_dir = l10n.get('arb-dir', 'lib/l10n')
+        if not arb_dir.startswith('lib'):
+            paths.append(arb_dir)
+
+    for entry in flutter.get('assets') or []:
+        if isinstance(entry, dict):
+            entry = entry.get('path')
+        if entry:
+            paths.extend(resolve_asset_entry(project_path, entry))
+    for family in flutter.get('fonts') or []:
+        for font in family.get('fonts') or []:
+            if font.get('asset'):
+                paths.append(font['asset'])
+
+    # Path dependencies inside the project are needed for flutter pub get
+    for section in ('dependencies', 'dev_dependencies', 'dependency_overrides'):
+        for spec in (pubspec.get(section) or {}).values():
+            if isinstance(spec, dict) and spec.get('path'):
+                dep_path = os.path.normpath(os.path.join(project_path, spec['path']))
+                if os.path.commonpath([os.path.abspath(dep_path), os.path.abspath(project_path)]) == os.path.abspath(project_path):
+                    paths.append(os.path.relpath(dep_path, project_path).replace(os.sep, '/'))
+
+    for platform_name in platforms or []:
+        folder = platform_name.lower()
+        if os.path.isdir(os.path.join(project_path, folder)):
+            paths.append(folder)
+
+    paths = [path for path in dict.fromkeys(paths) if os.path.exists(os.path.join(project_path, path))]
+    if verbose:
+        print(Fore.CYAN + f"Minimal upload set: {len(paths)} path(s)")
+        for path in paths:
+            print(Fore.CYAN + f"  {path}")
+    return paths
+
+
+LFS_ATTRIBUTES = "filter=lfs diff=lfs merge=lfs -text"
+
+
+def uses_lfs(project_path):
+    # Files routed through LFS on an earlier run stay pointers until the workflow pulls them
+    try:
+        with open(os.path.join(project_path, '.gitattributes'), 'r', encoding='utf-8') as f:
+            return any('filter=lfs' in line for line in f if not line.lstrip().startswith('#'))
+    except OSError:
+        return False
+
+
+def route_large_files_to_lfs(project_path, git_backend, threshold, verbose=False):
+    print(Fore.YELLOW + f"Routing staged files over {threshold / (1024 * 1024):g} MB through Git LFS...")
+    attributes_path = os.path.join(project_path, '.gitattributes')
+    existing = set()
+    if os.path.exists(attributes_path):
+        with open(attributes_path, 'r', encoding='utf-8') as f:
+            existing = {line.split(' ', 1)[0] for line in f if LFS_ATTRIBUTES in line}
+
+    large_files = []
+    for path in git_backend.staged_blobs():
+        pattern = path.replace(' ', '[[:space:]]')
+        if pattern in existing:
+            continue
+        try:
+            size = os.path.getsize(os.path.join(project_path, path))
+        except OSError:
+            continue
+        if size > threshold:
+            large_files.append(path)
+            if verbose:
+                print(Fore.CYAN + f"  {path} ({size / (1024 * 1024):.1f} MB)")
+    if not large_files:
+        print(Fore.GREEN + "No new large files found.")
+        return []
+
+    returncode, _, _ = run_command("git lfs version", cwd=project_path, check=False, capture_only=True)
+    if returncode != 0:
+        print(Fore.YELLOW + "Git LFS is not installed. Large files will be committed as regular blobs.")
+        return []
+
+    with open(attributes_path, 'a', encoding='utf-8') as f:
+        for path in large_files:
+            f.write(f"{path.replace(' ', '[[:space:]]')} {LFS_ATTRIBUTES}\n")
+    git_backend.track_lfs(large_files)
+    print(Fore.GREEN + f"{len(large_files)} large file(s) routed through Git LFS.")
+    return large_files
+
+
+GIT_BACKENDS = {
+    'subprocess': SubprocessGitBackend,
+    'dulwich': DulwichGitBackend,
+}
+
+
+def get_git_backend(name, project_path, verbose=False):
+    return GIT_BACKENDS[name or 'subprocess'](project_path, verbose=verbose)
+
+
 def upload_project(repo_name, github_token, project_path, branch, ipa_name, apk_name,
-                  include_patterns=None, exclude_patterns=None, remotes=None, verbose=False):
+                  include_patterns=None, exclude_patterns=None, remotes=None, workflow_content=None, secret_scan=True,
+                  git_backend=None, lfs_threshold=None, upload_mode='all', platforms=None, verbose=False):
+    import hashlib
+    git_backend = git_backend or SubprocessGitBackend(project_path, verbose=verbose)
     if not os.path.isdir(os.path.join(project_path, ".git")):
         print(Fore.YELLOW + "Initializing Git repository...")
-        run_command("git init", cwd=project_path, verbose=verbose)
+        git_backend.init()
 
     github_username = get_github_username(github_token)
     remote_urls = []
@@ -296,55 +681,153 @@ def upload_project(repo_name, github_token, project_path, branch, ipa_name, apk_
         remote_hash = hashlib.md5(remote_url.encode()).hexdigest()[:6]
         remote_name = f"origin_{remote_hash}"
         print(Fore.YELLOW + f"Adding remote '{remote_name}' to {remote_url}")
-        run_command(f"git remote add {remote_name} {remote_url}", cwd=project_path, verbose=verbose, check=False)
+        git_backend.add_remote(remote_name, remote_url)
+
+    if workflow_content is not None:
+        # Single-push mode: the workflow goes out with the project in one commit
+        write_workflow_file(workflow_content, project_path, verbose=verbose)
 
     print(Fore.YELLOW + "Adding files to Git...")
-    add_command = "git add ."
-    if include_patterns:
-        include_str = ' '.join(include_patterns)
-        add_command = f"git add {include_str}"
+    pathspecs = ['.']
+    if upload_mode == 'minimal':
+        print(Fore.YELLOW + "Computing minimal upload set from pubspec.yaml...")
+        pathspecs = compute_minimal_upload_set(project_path, platforms, verbose=verbose) + list(include_patterns or [])
+        if os.path.isdir(os.path.join(project_path, '.github', 'workflows')):
+            pathspecs.append(os.path.join('.github', 'workflows'))
+        # Start from an empty index, otherwise files tracked by earlier commits stay in the pushed tree
+        git_backend.remove_cached('.')
+    elif include_patterns:
+        pathspecs = list(include_patterns)
+        if workflow_content is not None:
+            pathspecs.append(os.path.join('.github', 'workflows'))
+    git_backend.add(pathspecs)
     if exclude_patterns:
+        # Unstage after adding, otherwise git add would stage the excluded files again
         print(Fore.YELLOW + "Excluding specified patterns from git add.")
         for pattern in exclude_patterns:
-            run_command(f"git rm -r --cached {pattern}", cwd=project_path, verbose=verbose, check=False)
-    run_command(add_command, cwd=project_path, verbose=verbose)
+            git_backend.remove_cached(pattern)
+
+    if lfs_threshold:
+        route_large_files_to_lfs(project_path, git_backend, lfs_threshold, verbose=verbose)
+
+    if secret_scan:
+        findings = scan_staged_files_for_secrets(project_path, git_backend, verbose=verbose)
+        if findings:
+            print(Fore.RED + "Possible secrets found in staged files:")
+            for path, rule, line in findings:
+                location = f"{path}:{line}" if line else path
+                print(Fore.RED + f"  {location} ({rule})")
+            print(Fore.RED + "Remove the secrets or exclude the files with --exclude, then try again.")
+            print(Fore.RED + "Use --skip-secret-scan to push anyway.")
+            sys.exit(1)
+        print(Fore.GREEN + "No secrets found in staged files.")
 
     commit_message = "Initial commit"
-    returncode, stdout, _ = run_command(f'git commit -m "{commit_message}"', cwd=project_path, verbose=verbose, check=False)
-    commit_output = stdout.lower() if stdout else ''
-    if returncode != 0:
-        if "nothing to commit" in commit_output or "working tree clean" in commit_output:
-            print(Fore.YELLOW + "Nothing to commit. Skipping commit step.")
-        else:
-            print(Fore.RED + f"Error during git commit:\n{stdout}")
-            sys.exit(1)
-    else:
+    if git_backend.commit(commit_message):
         print(Fore.GREEN + "Commit created.")
+    else:
+        print(Fore.YELLOW + "Nothing to commit. Skipping commit step.")
+
+    git_backend.rename_branch(branch)
 
     # Push to all remotes
-    for remote_url in remote_urls:
-        remote_hash = hashlib.md5(remote_url.encode()).hexdigest()[:6]
-        remote_name = f"origin_{remote_hash}"
-        try:
-            run_command(f"git branch -M {branch}", cwd=project_path, verbose=verbose)
-            run_command(f"git push -u {remote_name} {branch} -f", cwd=project_path, verbose=verbose)
-            print(Fore.GREEN + f"Project successfully uploaded to repository '{repo_name}' at remote '{remote_name}'.")
-        except SystemExit:
+    remote_names = [f"origin_{hashlib.md5(remote_url.encode()).hexdigest()[:6]}" for remote_url in remote_urls]
+    failed = git_backend.push_all(remote_names, branch, force=True)
+    for remote_name in remote_names:
+        if remote_name in failed:
             # If push fails due to GH push protection, instruct user to fix
             print(Fore.RED + f"Push to '{remote_name}' failed due to repository rule violations (e.g., secret scanning).")
-            print(Fore.RED + "Please remove any secrets from your files and commit again, or follow GitHub's instructions.")
-            sys.exit(1)
+        else:
+            print(Fore.GREEN + f"Project successfully uploaded to repository '{repo_name}' at remote '{remote_name}'.")
+    if failed:
+        print(Fore.RED + "Please remove any secrets from your files and commit again, or follow GitHub's instructions.")
+        sys.exit(1)
 
     print(Fore.GREEN + f"Project successfully uploaded to repository '{repo_name}'.")
 
 
+SECRET_SCAN_VERSION = 1
+SECRET_PATTERNS = re.compile(
+    rb'(?P<github_token>\b(?:gh[pousr]_[A-Za-z0-9]{36,}|github_pat_[A-Za-z0-9_]{22,}))'
+    rb'|(?P<private_key>-----BEGIN (?:RSA |EC |DSA |OPENSSH |PGP |ENCRYPTED )?PRIVATE KEY(?: BLOCK)?-----)'
+    rb'|(?P<google_api_key>\bAIza[0-9A-Za-z_\-]{35}\b)'
+    rb'|(?P<aws_access_key>\b(?:AKIA|ASIA)[0-9A-Z]{16}\b)'
+    rb'|(?P<slack_token>\bxox[abprs]-[0-9A-Za-z\-]{10,})'
+    rb'|(?P<stripe_key>\b[sr]k_live_[0-9A-Za-z]{24,})'
+)
+SECRET_FILE_SUFFIXES = ('.jks', '.keystore', '.p12', '.pfx')
+BINARY_SNIFF_BYTES = 8000
+
+
+def scan_blob_for_secrets(file_path):
+    with open(file_path, 'rb') as f:
+        # Binaries are skipped, so only read the rest once the head looks like text
+        content = f.read(BINARY_SNIFF_BYTES)
+        if b'\0' in content:
+            return []
+        content += f.read()
+    findings = []
+    for match in SECRET_PATTERNS.finditer(content):
+        line = content.count(b'\n', 0, match.start()) + 1
+        findings.append([match.lastgroup, line])
+    return findings
+
+
+def scan_staged_files_for_secrets(project_path, git_backend, verbose=False):
+    from concurrent.futures import ThreadPoolExecutor
+    print(Fore.YELLOW + "Scanning staged files for secrets...")
+    blobs = git_backend.staged_blobs()
+    cache_path = os.path.join(project_path, '.git', 'secret-scan-cache.json')
+    cache = {}
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        if cached.get('version') == SECRET_SCAN_VERSION:
+            cache = cached.get('blobs', {})
+    except (OSError, ValueError):
+        pass
+
+    findings = []
+    for path in blobs:
+        if path.lower().endswith(SECRET_FILE_SUFFIXES):
+            findings.append((path, 'keystore_file', None))
+
+    pending = {path: blob for path, blob in blobs.items() if blob not in cache}
+    if pending:
+        with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as executor:
+            futures = {
+                path: executor.submit(scan_blob_for_secrets, os.path.join(project_path, path))
+                for path in pending
+            }
+            for path, future in futures.items():
+                try:
+                    cache[pending[path]] = future.result()
+                except OSError as e:
+                    if verbose:
+                        print(Fore.YELLOW + f"Could not read {path}: {e}")
+    if verbose:
+        print(Fore.CYAN + f"Scanned {len(pending)} of {len(blobs)} staged files ({len(blobs) - len(pending)} cached).")
+
+    for path, blob in blobs.items():
+        for rule, line in cache.get(blob, []):
+            findings.append((path, rule, line))
+
+    try:
+        with open(cache_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': SECRET_SCAN_VERSION, 'blobs': {blob: cache[blob] for blob in blobs.values() if blob in cache}}, f)
+    except OSError:
+        pass
+    return findings
+
+
 def get_github_username(github_token):
+    from github import Github
     g = Github(github_token)
     user = g.get_user()
     return user.login
 
 
-def add_github_actions_workflow(workflow_content, project_path, verbose=False):
+def write_workflow_file(workflow_content, project_path, verbose=False):
     workflow_dir = os.path.join(project_path, '.github', 'workflows')
 
     if os.path.exists(workflow_dir):
@@ -361,33 +844,91 @@ def add_github_actions_workflow(workflow_content, project_path, verbose=False):
     with open(workflow_path, 'w', encoding='utf-8') as f:
         f.write(workflow_content)
     print(Fore.GREEN + "GitHub Actions workflow file successfully created locally.")
+    return workflow_dir
+
 
-    run_command(f"git add {workflow_dir}", cwd=project_path, verbose=verbose)
+WORKFLOW_PATH = '.github/workflows/build.yml'
+
+
+def workflow_is_current(workflow_content, project_path, git_backend):
+    # Only build.yml may exist locally, and the pushed copy must match byte for byte
+    workflow_dir = os.path.join(project_path, '.github', 'workflows')
+    if not os.path.isdir(workflow_dir) or os.listdir(workflow_dir) != ['build.yml']:
+        return False
+    with open(os.path.join(workflow_dir, 'build.yml'), 'r', encoding='utf-8') as f:
+        if f.read() != workflow_content:
+            return False
+    return git_backend.committed_file(WORKFLOW_PATH, '@{upstream}') == workflow_content
+
+
+def add_github_actions_workflow(workflow_content, project_path, git_backend=None, verbose=False):
+    git_backend = git_backend or SubprocessGitBackend(project_path, verbose=verbose)
+    if workflow_is_current(workflow_content, project_path, git_backend):
+        print(Fore.GREEN + "Workflow unchanged since the last push. Skipping commit and push.")
+        return False
+    write_workflow_file(workflow_content, project_path, verbose=verbose)
+
+    git_backend.add([os.path.join('.github', 'workflows')])
     commit_message = "Update GitHub Actions workflow"
-    returncode, stdout, _ = run_command(f'git commit -m "{commit_message}"', cwd=project_path, verbose=verbose, check=False)
-    commit_output = stdout.lower() if stdout else ''
-    if returncode != 0:
-        if "nothing to commit" in commit_output or "working tree clean" in commit_output:
-            print(Fore.YELLOW + "Workflow file already committed or no changes. Skipping commit step.")
-        else:
-            print(Fore.RED + f"Error during git commit:\n{stdout}")
-            sys.exit(1)
-    else:
+    if git_backend.commit(commit_message):
         print(Fore.GREEN + "Workflow commit created.")
+    else:
+        print(Fore.YELLOW + "Workflow file already committed or no changes. Skipping commit step.")
 
     print(Fore.YELLOW + "Pushing workflow to GitHub...")
     try:
-        run_command("git push", cwd=project_path, verbose=verbose)
+        git_backend.push()
     except SystemExit:
         print(Fore.RED + "Push failed due to repository rule violations. Please fix the issue and try again.")
         sys.exit(1)
     print(Fore.GREEN + "GitHub Actions workflow file successfully pushed to repository.")
+    return True
+
 
+def backoff_delays(initial=0.25, factor=2, maximum=4.0):
+    delay = initial
+    while True:
+        yield delay
+        delay = min(delay * factor, maximum)
+
+
+def wait_for_workflow_registration(repo_name, github_token, branch, workflow_content=None, timeout=60, verbose=False):
+    import requests
     print(Fore.YELLOW + "Waiting for GitHub to register the new workflow...")
-    time.sleep(10)  # Wait for 10 seconds
+    owner = get_github_username(github_token)
+    workflow_url = f"https://api.github.com/repos/{owner}/{repo_name}/actions/workflows/build.yml"
+    contents_url = f"https://api.github.com/repos/{owner}/{repo_name}/contents/.github/workflows/build.yml"
+    headers = {
+        "Authorization": f"token {github_token}",
+        "Accept": "application/vnd.github.v3+json"
+    }
+    expected = workflow_content.replace('\r\n', '\n') if workflow_content is not None else None
+    start_time = time.time()
+    for delay in backoff_delays():
+        response = requests.get(workflow_url, headers=headers)
+        if response.status_code == 200 and response.json().get('state') == 'active':
+            if expected is None:
+                break
+            # Make sure GitHub serves the content we just pushed, not a stale build.yml
+            contents = requests.get(contents_url, headers=headers, params={"ref": branch})
+            if contents.status_code == 200:
+                remote = base64.b64decode(contents.json().get('content', '')).decode('utf-8', errors='ignore')
+                if remote.replace('\r\n', '\n') == expected:
+                    break
+            elif verbose:
+                print(Fore.CYAN + f"Workflow content not available yet: {contents.status_code}")
+        elif verbose:
+            print(Fore.CYAN + f"Workflow not registered yet: {response.status_code}")
+        if time.time() - start_time + delay > timeout:
+            print(Fore.YELLOW + "Workflow registration not confirmed in time. Trying to dispatch anyway.")
+            return False
+        time.sleep(delay)
+    print(Fore.GREEN + f"Workflow registered after {time.time() - start_time:.1f}s.")
+    return True
 
 
 def set_workflow_permissions(repo_name, github_token, verbose=False):
+    import requests
     print(Fore.YELLOW + "Setting GitHub Actions permissions to 'Read and write'...")
     owner = get_github_username(github_token)
     url = f"https://api.github.com/repos/{owner}/{repo_name}/actions/permissions"
@@ -410,7 +951,8 @@ def set_workflow_permissions(repo_name, github_token, verbose=False):
         sys.exit(1)
 
 
-def trigger_workflow_dispatch(repo_name, github_token, branch, verbose=False):
+def trigger_workflow_dispatch(repo_name, github_token, branch, retry_timeout=30, verbose=False):
+    import requests
     print(Fore.YELLOW + "Triggering GitHub Actions workflow via API...")
     owner = get_github_username(github_token)
     url = f"https://api.github.com/repos/{owner}/{repo_name}/actions/workflows/build.yml/dispatches"
@@ -419,15 +961,27 @@ def trigger_workflow_dispatch(repo_name, github_token, branch, verbose=False):
         "Accept": "application/vnd.github.v3+json"
     }
     data = {"ref": branch}
-    response = requests.post(url, headers=headers, json=data)
-    if response.status_code == 204:
-        print(Fore.GREEN + "Workflow dispatch event triggered successfully.")
-    else:
-        print(Fore.RED + f"Failed to trigger workflow dispatch: {response.status_code} - {response.text}")
-        sys.exit(1)
+    start_time = time.time()
+    for delay in backoff_delays():
+        response = requests.post(url, headers=headers, json=data)
+        if response.status_code == 204:
+            print(Fore.GREEN + "Workflow dispatch event triggered successfully.")
+            return
+        # GitHub answers 404, or 422 without a workflow_dispatch trigger, until the pushed workflow is registered
+        not_registered = response.status_code == 404 or (
+            response.status_code == 422 and "workflow_dispatch" in response.text
+        )
+        if not not_registered or time.time() - start_time + delay > retry_timeout:
+            break
+        if verbose:
+            print(Fore.CYAN + f"Workflow not found yet ({response.status_code}). Retrying in {delay:.2f}s...")
+        time.sleep(delay)
+    print(Fore.RED + f"Failed to trigger workflow dispatch: {response.status_code} - {response.text}")
+    sys.exit(1)
 
 
 def wait_for_workflow_completion(repo, github_token, build_timeout, poll_interval, branch, verbose=False):
+    from github import Github
     g = Github(github_token)
     user = g.get_user()
     repository = g.get_repo(f"{user.login}/{repo.name}")
@@ -478,10 +1032,19 @@ def wait_for_workflow_completion(repo, github_token, build_timeout, poll_interva
                     download_and_display_workflow_logs(repository, workflow_run.id, github_token)
                 sys.exit(1)
     print(Fore.RED + "Timeout reached. Workflow did not complete in time.")
+    if workflow_run is not None and workflow_run.status != "completed":
+        # Don't leave runners busy with a build nobody is waiting for
+        try:
+            workflow_run.cancel()
+            print(Fore.YELLOW + f"Cancelled workflow run {workflow_run.id}.")
+        except Exception as e:
+            print(Fore.RED + f"Failed to cancel workflow run {workflow_run.id}: {e}")
     sys.exit(1)
 
 
 def download_and_display_workflow_logs(repository, run_id, github_token):
+    import zipfile
+    import requests
     print(Fore.YELLOW + "Downloading workflow logs...")
     logs_url = f"https://api.github.com/repos/{repository.full_name}/actions/runs/{run_id}/logs"
     headers = {
@@ -500,23 +1063,22 @@ def download_and_display_workflow_logs(repository, run_id, github_token):
         print(Fore.RED + f"Failed to download workflow logs: {response.status_code} - {response.text}")
 
 
-def download_artifact(repo, artifact_name, builds_dir, file_extension, verbose=False):
-    print(Fore.YELLOW + f"Fetching the latest release for {file_extension.upper()}...")
+def get_latest_release_assets(repo):
     releases = repo.get_releases()
     if releases.totalCount == 0:
         print(Fore.RED + "No releases found.")
         sys.exit(1)
-    latest_release = releases[0]
-    assets = latest_release.get_assets()
-    artifact_asset = next((asset for asset in assets if asset.name.endswith(file_extension)), None)
-    if not artifact_asset:
-        print(Fore.RED + f"No {file_extension.upper()} file found in the latest release.")
-        sys.exit(1)
+    return list(releases[0].get_assets())
+
+
+def download_release_asset(artifact_asset, builds_dir, label, position=None):
+    import requests
+    from tqdm import tqdm
     download_url = artifact_asset.browser_download_url
-    print(Fore.GREEN + f"{file_extension.upper()} download URL: {download_url}")
+    print(Fore.GREEN + f"{label} download URL: {download_url}")
     os.makedirs(builds_dir, exist_ok=True)
     artifact_path = os.path.join(builds_dir, artifact_asset.name)
-    print(Fore.YELLOW + f"Downloading the {file_extension.upper()} file to '{artifact_path}'...")
+    print(Fore.YELLOW + f"Downloading the {label} file to '{artifact_path}'...")
     try:
         with requests.get(download_url, stream=True) as r:
             r.raise_for_status()
@@ -527,95 +1089,602 @@ def download_artifact(repo, artifact_name, builds_dir, file_extension, verbose=F
                 unit='iB',
                 unit_scale=True,
                 unit_divisor=1024,
+                position=position,
             ) as bar:
                 for chunk in r.iter_content(chunk_size=8192):
                     size = f.write(chunk)
                     bar.update(size)
-        print(Fore.GREEN + f"{file_extension.upper()} successfully downloaded to '{artifact_path}'.")
+        print(Fore.GREEN + f"{label} successfully downloaded to '{artifact_path}'.")
     except Exception as e:
-        print(Fore.RED + f"Error downloading the {file_extension.upper()}: {e}")
+        print(Fore.RED + f"Error downloading the {label}: {e}")
+        sys.exit(1)
+
+
+def download_artifact(repo, artifact_name, builds_dir, file_extension, verbose=False):
+    print(Fore.YELLOW + f"Fetching the latest release for {file_extension.upper()}...")
+    assets = get_latest_release_assets(repo)
+    artifact_asset = (next((asset for asset in assets if asset.name == artifact_name), None)
+                      or next((asset for asset in assets if asset.name.endswith(file_extension)), None))
+    if not artifact_asset:
+        print(Fore.RED + f"No {file_extension.upper()} file found in the latest release.")
+        sys.exit(1)
+    download_release_asset(artifact_asset, builds_dir, file_extension.upper())
+
+
+def download_artifacts(repo, artifact_names, builds_dir, max_workers=4, verbose=False):
+    # Fetches the assets of matrix builds concurrently; all of them must be present
+    from concurrent.futures import ThreadPoolExecutor
+    print(Fore.YELLOW + f"Fetching the latest release for {len(artifact_names)} artifacts...")
+    assets = {asset.name: asset for asset in get_latest_release_assets(repo)}
+    missing = [name for name in artifact_names if name not in assets]
+    if missing:
+        print(Fore.RED + f"Missing from the latest release: {', '.join(missing)}")
+        sys.exit(1)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(download_release_asset, assets[name], builds_dir, name, position)
+            for position, name in enumerate(artifact_names)
+        ]
+        for future in futures:
+            future.result()
+
+
+FLUTTER_APK_DIR = 'build/app/outputs/flutter-apk'
+DEFAULT_TARGET = 'lib/main.dart'
+# Target platforms of --split-per-abi builds and the ABI each APK is named after
+ANDROID_ABIS = {
+    'android-arm64': 'arm64-v8a',
+    'android-arm': 'armeabi-v7a',
+    'android-x64': 'x86_64',
+}
+WORKFLOW_EXPRESSION = re.compile(r'\$\{\{\s*(.*?)\s*\}\}')
+MATRIX_EXPRESSION = re.compile(r'\$\{\{\s*matrix\.([A-Za-z0-9_-]+)\s*\}\}')
+
+
+def variant_name(name, *suffixes):
+    # FlutterApkExport.apk -> FlutterApkExport-prod-arm64-v8a.apk
+    stem, extension = os.path.splitext(name)
+    return '-'.join([stem] + [suffix for suffix in suffixes if suffix]) + extension
+
+
+def flutter_apk_name(abi=None, flavor=None):
+    # Mirrors Flutter's naming: app-release.apk, app-prod-release.apk, app-arm64-v8a-prod-release.apk.
+    # Flutter lowercases the flavor in file names, so stagingQa builds app-stagingqa-release.apk.
+    return '-'.join(part for part in ('app', abi, flavor and flavor.lower(), 'release') if part) + '.apk'
+
+
+def expected_artifact_names(platforms, ipa_name, apk_name, flavors=None, split_per_abi=False):
+    flavors = list(flavors or []) or [None]
+    abis = list(ANDROID_ABIS.values()) if split_per_abi else [None]
+    names = []
+    if 'iOS' in platforms:
+        names.extend(variant_name(ipa_name, flavor) for flavor in flavors)
+    if 'Android' in platforms:
+        names.extend(variant_name(apk_name, flavor, abi) for flavor in flavors for abi in abis)
+    return names
+
+
+def resolve_flavor_targets(flavors, targets):
+    # One --target for all flavors (may contain {flavor}), or one per flavor in order
+    targets = targets or []
+    if not flavors:
+        if len(targets) > 1:
+            print(Fore.RED + "Several --target entrypoints need a matching list of --flavors.")
+            sys.exit(1)
+        return {}
+    if len(targets) > 1 and len(targets) != len(flavors):
+        print(Fore.RED + f"Got {len(targets)} --target entrypoints for {len(flavors)} flavors; pass one per flavor or one for all.")
         sys.exit(1)
+    if len(targets) > 1:
+        return dict(zip(flavors, targets))
+    return {flavor: (targets[0].format(flavor=flavor) if targets else DEFAULT_TARGET) for flavor in flavors}
+
+
+# How the iOS job resolves pods: the steps it runs and what it caches for them.
+# Without a pod step 'flutter build ios' runs a plain pod install itself.
+COCOAPODS_STRATEGIES = {
+    'repo-update': {'paths': ['ios/Pods'], 'run': ['pod repo update']},
+    'skip-update': {'paths': ['ios/Pods'], 'run': []},
+    'cdn': {
+        'paths': ['ios/Pods', '~/.cocoapods/repos/trunk'],
+        'run': ['pod repo add-cdn trunk https://cdn.cocoapods.org/ || true', 'pod install || pod install --repo-update'],
+    },
+    'deployment': {'paths': ['ios/Pods'], 'run': ['pod install --deployment']},
+}
+
+# Files hashed on the runner when there is no local lockfile to key a cache on
+DEPENDENCY_HASH_FILES = {
+    'pub': ['**/pubspec.lock', '**/pubspec.yaml'],
+    'pods': ['ios/Podfile.lock', 'ios/Podfile'],
+    'gradle': ['android/**/*.gradle*', 'android/gradle/wrapper/gradle-wrapper.properties'],
+}
+
+
+def checkout_steps(lfs=False):
+    from workflow_model import Step
+    if not lfs:
+        return [Step(uses='actions/checkout@v3')]
+    # Check out pointers only, then pull just the LFS objects missing from the cache
+    return [
+        Step(uses='actions/checkout@v3', with_={'lfs': False}),
+        Step(name='List LFS objects', run="git lfs ls-files --long | cut -d ' ' -f1 | sort > .lfs-assets-id"),
+        Step(name='Restore LFS cache', uses='actions/cache@v3', with_={
+            'path': '.git/lfs',
+            'key': "lfs-${{ hashFiles('.lfs-assets-id') }}",
+            'restore-keys': 'lfs-',
+        }),
+        Step(name='Pull LFS objects', run='git lfs pull'),
+    ]
+
+
+def cache_step(name, paths, kind, dependency_hashes, prefix=None):
+    from workflow_model import Step
+    prefix = prefix or kind
+    digest = dependency_hashes.get(kind)
+    if not digest:
+        patterns = ', '.join(f"'{pattern}'" for pattern in DEPENDENCY_HASH_FILES[kind])
+        digest = f"${{{{ hashFiles({patterns}) }}}}"
+    return Step(name=name, uses='actions/cache@v3', with_={
+        'path': '\n'.join(paths) + ('\n' if len(paths) > 1 else ''),
+        'key': f"{prefix}-${{{{ runner.os }}}}-{digest}",
+        'restore-keys': f"{prefix}-${{{{ runner.os }}}}-",
+    })
+
+
+# Build state reused across runs. Final outputs are left out so packaging always starts clean.
+INCREMENTAL_CACHE_PATHS = {
+    'ios': ['.dart_tool', 'build/ios', '!build/ios/iphoneos', '~/Library/Developer/Xcode/DerivedData'],
+    'android': ['.dart_tool', 'build', '!build/app/outputs', '~/.gradle/caches/build-cache-1'],
+}
+INCREMENTAL_SOURCE_FILES = {
+    'ios': ['lib/**', 'ios/**', '!ios/Pods/**', 'pubspec.yaml'],
+    'android': ['lib/**', 'android/**', 'pubspec.yaml'],
+}
+INCREMENTAL_LOCK_KINDS = {'ios': ['pub', 'pods'], 'android': ['pub', 'gradle']}
+
+
+def incremental_cache_step(platform_key, dependency_hashes, variant=None):
+    # Exact hits need the same lockfiles and sources; otherwise the newest state
+    # for the same lockfiles, then for the platform, is restored and rebuilt incrementally
+    from workflow_model import Step
+    kinds = INCREMENTAL_LOCK_KINDS[platform_key]
+    if all(kind in dependency_hashes for kind in kinds):
+        lock = '-'.join(dependency_hashes[kind][:12] for kind in kinds)
+    else:
+        patterns = ', '.join(f"'{pattern}'" for kind in kinds for pattern in DEPENDENCY_HASH_FILES[kind])
+        lock = f"${{{{ hashFiles({patterns}) }}}}"
+    sources = ', '.join(f"'{pattern}'" for pattern in INCREMENTAL_SOURCE_FILES[platform_key])
+    prefix = f"build-{platform_key}-${{{{ runner.os }}}}" + (f"-{variant}" if variant else '')
+    return Step(name='Cache incremental build state', uses='actions/cache@v3', with_={
+        'path': '\n'.join(INCREMENTAL_CACHE_PATHS[platform_key]) + '\n',
+        'key': f"{prefix}-{lock}-${{{{ hashFiles({sources}) }}}}",
+        'restore-keys': f"{prefix}-{lock}-\n{prefix}-\n",
+    })
+
+
+def runner_architecture(runs_on):
+    # Guess the CPU of a runner from its labels so flutter-action installs a native SDK
+    labels = [runs_on] if isinstance(runs_on, str) else list(runs_on)
+    labels = [label.lower() for label in labels]
+    if any(label in ('arm64', 'arm', 'aarch64') or label.endswith('-arm') or label.endswith('-arm64') for label in labels):
+        return 'arm64'
+    if any(label in ('x64', 'x86_64', 'intel') for label in labels):
+        return 'x64'
+    for label in labels:
+        # GitHub's macOS 13 and the -large images are Intel, newer hosted macOS images are Apple silicon
+        if label.startswith('macos-'):
+            return 'x64' if label.startswith(('macos-12', 'macos-13')) or label.endswith('-large') else 'arm64'
+    return 'x64'
+
+
+def flutter_setup_step(flutter_version=None, architecture='x64'):
+    from workflow_model import Step
+    inputs = {'channel': 'stable'}
+    if flutter_version:
+        inputs['flutter-version'] = flutter_version
+    inputs.update({'architecture': architecture, 'cache': True, 'cache-key': 'flutter-:os:-:channel:-:version:-:arch:'})
+    return Step(uses='subosito/flutter-action@v2', with_=inputs)
+
+
+def release_upload_step(name, path):
+    from workflow_model import Step
+    return Step(name=name, uses='svenstaro/upload-release-action@v2', with_={
+        'repo_token': '${{ secrets.GITHUB_TOKEN }}',
+        'file': path,
+        'tag': 'v1.0',
+        'overwrite': True,
+        'body': 'This is the first release',
+    })
+
+
+def runner_labels(labels):
+    # One label stays a plain runs-on string, several become a label array
+    return labels[0] if len(labels) == 1 else list(labels)
+
+
+def build_workflow(platforms, ipa_name, apk_name, branch, lfs=False, dependency_hashes=None, flutter_version=None,
+                   cocoapods_strategy='cdn', split_per_abi=False, flavors=None, target=None,
+                   ios_runner='macos-latest', android_runner='ubuntu-latest', ios_architecture=None,
+                   android_architecture=None, build_timeout=None, incremental_cache=False, ipa_compression=9):
+    from workflow_model import Job, Step, Workflow
+    dependency_hashes = dependency_hashes or {}
+    # Keys carry the lockfile hashes computed locally, so caches roll over exactly when dependencies change
+    pub_cache = cache_step('Cache pub dependencies', ['~/.pub-cache'], 'pub', dependency_hashes)
+    # Flavors and ABIs become matrix jobs that build in parallel, each publishing uniquely named artifacts
+    flavor_entries = [{'flavor': flavor, 'target': target} for flavor, target in (flavors or {}).items()]
+    flavor = "${{ matrix.flavor }}" if flavor_entries else None
+    build_flags = " --flavor ${{ matrix.flavor }} --target ${{ matrix.target }}" if flavor_entries else ''
+    if target and not flavor_entries:
+        build_flags = f" --target {target}"
+    # A new dispatch cancels the run still going on the same branch, and jobs stop
+    # when the client would give up waiting for them anyway
+    workflow = Workflow(name='Build', concurrency={
+        'group': '${{ github.workflow }}-${{ github.ref }}',
+        'cancel-in-progress': True,
+    })
+    timeout_minutes = math.ceil(build_timeout / 60) if build_timeout else None
+
+    if 'iOS' in platforms:
+        cocoapods = COCOAPODS_STRATEGIES[cocoapods_strategy]
+        uploaded_ipa_name = variant_name(ipa_name, flavor)
+        steps = checkout_steps(lfs)
+        if incremental_cache:
+            steps.append(incremental_cache_step('ios', dependency_hashes, flavor))
+        steps += [
+            flutter_setup_step(flutter_version, ios_architecture or runner_architecture(ios_runner)),
+            Step(run='flutter config --no-analytics'),
+            pub_cache,
+            Step(run='flutter pub get'),
+            # The strategy is part of the key, since each one leaves different state behind
+            cache_step('Cache CocoaPods', cocoapods['paths'], 'pods', dependency_hashes,
+                       prefix=f"pods-{cocoapods_strategy}"),
+        ]
+        if cocoapods['run'] and cocoapods_strategy != 'repo-update':
+            steps.append(Step(run='flutter precache --ios'))
+        steps.extend(Step(run=command, working_directory='ios') for command in cocoapods['run'])
+        steps.extend([
+            Step(run=f"flutter build ios --release --no-codesign --verbose{build_flags}"),
+            Step(name='Verify Build Output', run='ls -la build/ios/iphoneos'),
+            Step(run='mkdir Payload', working_directory='build/ios/iphoneos'),
+            Step(run='mv Runner.app Payload', working_directory='build/ios/iphoneos'),
+            Step(name='Zip output', run=f"zip -qq -r -{ipa_compression} {uploaded_ipa_name} Payload",
+                 working_directory='build/ios/iphoneos'),
+            release_upload_step('Upload binaries to release', f"build/ios/iphoneos/{uploaded_ipa_name}"),
+        ])
+        workflow.jobs.append(Job(
+            id='build-ios',
+            name='iOS Build' + (" (${{ matrix.flavor }})" if flavor_entries else ''),
+            runs_on=ios_runner,
+            timeout_minutes=timeout_minutes,
+            matrix=flavor_entries,
+            steps=steps,
+        ))
+
+    if 'Android' in platforms:
+        abi_entries = [{'platform': target_platform, 'abi': abi} for target_platform, abi in ANDROID_ABIS.items()] if split_per_abi else []
+        abi = "${{ matrix.abi }}" if abi_entries else None
+        matrix = []
+        if flavor_entries or abi_entries:
+            # --flavor and the uploaded name keep the flavor as typed, the built APK name is lowercased
+            apk_flavor_entries = [{**entry, 'apk_flavor': entry['flavor'].lower()} for entry in flavor_entries]
+            matrix = [{**flavor_entry, **abi_entry}
+                      for flavor_entry in apk_flavor_entries or [{}] for abi_entry in abi_entries or [{}]]
+        labels = [label for label in (flavor, "${{ matrix.platform }}" if abi else None) if label]
+        apk_build_flags = build_flags
+        if abi_entries:
+            apk_build_flags += " --split-per-abi --target-platform ${{ matrix.platform }}"
+        built_apk_name = flutter_apk_name(abi, "${{ matrix.apk_flavor }}" if flavor_entries else None)
+        uploaded_apk_name = variant_name(apk_name, flavor, abi)
+        steps = checkout_steps(lfs)
+        if incremental_cache:
+            steps.append(incremental_cache_step('android', dependency_hashes, '-'.join(labels)))
+        gradle_paths = ['~/.gradle/caches', '~/.gradle/wrapper']
+        if incremental_cache:
+            # The build cache belongs to the incremental cache; keep it out of the dependency snapshot
+            gradle_paths.append('!~/.gradle/caches/build-cache-1')
+        steps += [
+            flutter_setup_step(flutter_version, android_architecture or runner_architecture(android_runner)),
+            pub_cache,
+            cache_step('Cache Gradle dependencies', gradle_paths, 'gradle', dependency_hashes),
+        ]
+        if incremental_cache:
+            steps.append(Step(name='Enable Gradle build cache',
+                              run='mkdir -p ~/.gradle && echo "org.gradle.caching=true" >> ~/.gradle/gradle.properties'))
+        steps += [
+            Step(run='flutter pub get'),
+            Step(run=f"flutter build apk --release --verbose{apk_build_flags}"),
+        ]
+        if uploaded_apk_name != built_apk_name:
+            steps.append(Step(run=f"mv {built_apk_name} {uploaded_apk_name}", working_directory=FLUTTER_APK_DIR))
+        steps.append(release_upload_step('Upload APK to release', f"{FLUTTER_APK_DIR}/{uploaded_apk_name}"))
+        workflow.jobs.append(Job(
+            id='build-android',
+            name='Android Build' + (f" ({', '.join(labels)})" if labels else ''),
+            runs_on=android_runner,
+            timeout_minutes=timeout_minutes,
+            matrix=matrix,
+            steps=steps,
+        ))
+    return workflow.validate()
+
+
+def get_workflow_yaml(*args, **kwargs):
+    return build_workflow(*args, **kwargs).to_yaml()
+
+
+DART_PACKAGE_NAME = re.compile(r'^[a-z_][a-z0-9_]*$')
+ARTIFACT_NAME = re.compile(r'^[A-Za-z0-9._-]+$')
+FLAVOR_NAME = re.compile(r'^[A-Za-z0-9_-]+$')
+PLATFORM_SCAFFOLDING = {
+    'iOS': [['ios/Runner.xcodeproj/project.pbxproj'], ['ios/Runner/Info.plist']],
+    'Android': [
+        ['android/app/build.gradle', 'android/app/build.gradle.kts'],
+        ['android/settings.gradle', 'android/settings.gradle.kts'],
+        ['android/app/src/main/AndroidManifest.xml'],
+    ],
+}
+
+
+def android_declares_flavor(project_path, flavor):
+    # A textual check is enough to catch typos without evaluating Gradle
+    for name in ('build.gradle', 'build.gradle.kts'):
+        try:
+            with open(os.path.join(project_path, 'android', 'app', name), 'r', encoding='utf-8') as f:
+                content = f.read()
+        except OSError:
+            continue
+        if 'productFlavors' in content and re.search(rf'\b{re.escape(flavor)}\b', content):
+            return True
+    return False
+
+
+def substitute_matrix(value, entry):
+    if isinstance(value, dict):
+        return {key: substitute_matrix(item, entry) for key, item in value.items()}
+    if isinstance(value, list):
+        return [substitute_matrix(item, entry) for item in value]
+    if isinstance(value, str):
+        return MATRIX_EXPRESSION.sub(lambda match: str(entry.get(match.group(1), match.group(0))), value)
+    return value
+
+
+def workflow_produced_paths(steps):
+    # Paths the run steps of a job leave behind, as far as the upload steps care
+    produced = set()
+    for step in steps:
+        command = step.get('run')
+        if not command:
+            continue
+        directory = step.get('working-directory', '.')
+        for line in command.splitlines():
+            # Squeeze ${{ expr }} into one word so shlex keeps it together
+            words = shlex.split(WORKFLOW_EXPRESSION.sub(r'${{\1}}', line))
+            if words[:3] == ['flutter', 'build', 'apk']:
+                flavor = words[words.index('--flavor') + 1] if '--flavor' in words[:-1] else None
+                abis = [None]
+                if '--split-per-abi' in words:
+                    target_platform = words[words.index('--target-platform') + 1] if '--target-platform' in words[:-1] else None
+                    abis = [ANDROID_ABIS[target_platform]] if target_platform in ANDROID_ABIS else list(ANDROID_ABIS.values())
+                produced.update(f"{FLUTTER_APK_DIR}/{flutter_apk_name(abi, flavor)}" for abi in abis)
+            elif words[:1] == ['zip']:
+                archive = next((word for word in words[1:] if not word.startswith('-')), None)
+                if archive:
+                    produced.add(os.path.normpath(os.path.join(directory, archive)))
+            elif words[:1] == ['mv'] and len(words) == 3:
+                # A rename only produces its target when an earlier step produced the source
+                source = os.path.normpath(os.path.join(directory, words[1]))
+                if source in produced:
+                    produced.discard(source)
+                    produced.add(os.path.normpath(os.path.join(directory, words[2])))
+    return produced
+
+
+def preflight_check(project_path, platforms, ipa_name, apk_name, workflow_yaml, cocoapods_strategy=None,
+                    flavors=None, target=None):
+    # Local checks only, no network or subprocesses, so they can always run
+    import yaml
+    errors = []
+    try:
+        pubspec = load_pubspec(project_path)
+    except FileNotFoundError:
+        return ["pubspec.yaml not found. Is --project-path a Flutter project?"]
+    except yaml.YAMLError as e:
+        return [f"pubspec.yaml is not valid YAML: {e}"]
+    if not isinstance(pubspec, dict):
+        return ["pubspec.yaml must be a mapping."]
+    if not DART_PACKAGE_NAME.match(str(pubspec.get('name', ''))):
+        errors.append(f"pubspec.yaml name {pubspec.get('name')!r} is not a valid Dart package name.")
+    if not isinstance(pubspec.get('dependencies'), dict) or 'flutter' not in pubspec['dependencies']:
+        errors.append("pubspec.yaml does not depend on the Flutter SDK.")
+    for entrypoint in sorted(set((flavors or {}).values()) or {target or DEFAULT_TARGET}):
+        if not os.path.isfile(os.path.join(project_path, entrypoint)):
+            errors.append(f"Entrypoint {entrypoint} not found.")
+    for flavor in flavors or {}:
+        if not FLAVOR_NAME.match(flavor):
+            errors.append(f"Flavor name {flavor!r} may only use letters, digits, '_' and '-'.")
+        if 'iOS' in platforms and not os.path.isfile(
+                os.path.join(project_path, 'ios', 'Runner.xcodeproj', 'xcshareddata', 'xcschemes', f'{flavor}.xcscheme')):
+            errors.append(f"iOS flavor '{flavor}' needs a shared Xcode scheme named '{flavor}'.")
+        if 'Android' in platforms and not android_declares_flavor(project_path, flavor):
+            errors.append(f"Android flavor '{flavor}' is not declared in android/app/build.gradle productFlavors.")
+
+    for platform_name in platforms:
+        for alternatives in PLATFORM_SCAFFOLDING.get(platform_name, []):
+            if not any(os.path.isfile(os.path.join(project_path, path)) for path in alternatives):
+                errors.append(f"{platform_name} build needs {' or '.join(alternatives)}. "
+                              f"Run 'flutter create --platforms={platform_name.lower()} .' to add it.")
+
+    if ('iOS' in platforms and cocoapods_strategy == 'deployment'
+            and not os.path.isfile(os.path.join(project_path, 'ios', 'Podfile.lock'))):
+        errors.append("--cocoapods deployment needs a committed ios/Podfile.lock. Run 'pod install' in ios/ first.")
+
+    for name, extension, platform_name in ((ipa_name, '.ipa', 'iOS'), (apk_name, '.apk', 'Android')):
+        if platform_name not in platforms:
+            continue
+        if not ARTIFACT_NAME.match(name) or not name.endswith(extension):
+            errors.append(f"Artifact name {name!r} must end in {extension} and use only letters, digits, '.', '_' and '-'.")
+
+    try:
+        workflow = yaml.safe_load(workflow_yaml)
+    except yaml.YAMLError as e:
+        return errors + [f"Generated workflow is not valid YAML: {e}"]
+    for job_name, job in (workflow.get('jobs') or {}).items():
+        # Check every matrix combination with its values filled in, the way the runner sees it
+        for entry in ((job.get('strategy') or {}).get('matrix') or {}).get('include') or [{}]:
+            steps = substitute_matrix(job.get('steps') or [], entry)
+            produced = workflow_produced_paths(steps)
+            for step in steps:
+                upload = (step.get('with') or {}).get('file') if 'upload-release-action' in step.get('uses', '') else None
+                if upload and os.path.normpath(WORKFLOW_EXPRESSION.sub(r'${{\1}}', upload)) not in produced:
+                    error = f"Job '{job_name}' uploads {upload}, but no earlier step produces it."
+                    if error not in errors:
+                        errors.append(error)
+    return errors
+
+
+def run_preflight_check(project_path, platforms, ipa_name, apk_name, workflow_yaml, cocoapods_strategy=None,
+                        flavors=None, target=None, verbose=False):
+    print(Fore.YELLOW + "Running pre-flight checks...")
+    started = time.perf_counter()
+    errors = preflight_check(project_path, platforms, ipa_name, apk_name, workflow_yaml, cocoapods_strategy,
+                             flavors, target)
+    for error in errors:
+        print(Fore.RED + f"  {error}")
+    if errors:
+        print(Fore.RED + "Pre-flight checks failed. Fix the problems above or pass --skip-preflight.")
+        sys.exit(1)
+    if verbose:
+        print(Fore.CYAN + f"Pre-flight checks took {(time.perf_counter() - started) * 1000:.0f} ms.")
+    print(Fore.GREEN + "Pre-flight checks passed.")
+
+
+TOOLCHAIN_CACHE_TTL = 6 * 60 * 60
+
+# Files whose content decides the resolved dependencies, per dependency kind
+DEPENDENCY_LOCKFILES = {
+    'pub': ['pubspec.lock'],
+    'pods': ['ios/Podfile.lock'],
+    'gradle': [
+        'android/**/*.lockfile',
+        'android/**/*.gradle',
+        'android/**/*.gradle.kts',
+        'android/gradle/wrapper/gradle-wrapper.properties',
+    ],
+}
+# Locally resolved state that is expensive to recreate
+DEPENDENCY_ARTIFACTS = {
+    'pub': ['.dart_tool/package_config.json', '.flutter-plugins', '.flutter-plugins-dependencies'],
+    'pods': ['ios/Pods'],
+    'gradle': [],
+}
+
+
+def dependency_lockfiles(project_path, kind):
+    paths = set()
+    for pattern in DEPENDENCY_LOCKFILES[kind]:
+        for match in glob.glob(os.path.join(project_path, pattern), recursive=True):
+            relative = os.path.relpath(match, project_path).replace(os.sep, '/')
+            if os.path.isfile(match) and '/build/' not in relative and '/.gradle/' not in relative:
+                paths.add(relative)
+    return sorted(paths)
+
+
+def dependency_hashes(project_path):
+    import hashlib
+    hashes = {}
+    for kind in DEPENDENCY_LOCKFILES:
+        lockfiles = dependency_lockfiles(project_path, kind)
+        if not lockfiles:
+            continue
+        digest = hashlib.sha256()
+        for path in lockfiles:
+            digest.update(path.encode() + b'\0')
+            with open(os.path.join(project_path, path), 'rb') as f:
+                digest.update(f.read().replace(b'\r\n', b'\n'))
+        hashes[kind] = digest.hexdigest()
+    return hashes
+
+
+def detect_flutter_version(project_path):
+    # Version pinned with FVM, if any, so CI builds with the same SDK
+    for config, field in (('.fvmrc', 'flutter'), (os.path.join('.fvm', 'fvm_config.json'), 'flutterSdkVersion')):
+        try:
+            with open(os.path.join(project_path, config), 'r', encoding='utf-8') as f:
+                version = json.load(f).get(field)
+        except (OSError, ValueError, AttributeError):
+            continue
+        if version:
+            return version
+    return None
+
+
+def get_user_cache_dir():
+    current_os = platform.system()
+    if current_os == "Windows":
+        base = os.getenv('LOCALAPPDATA') or os.path.expanduser(os.path.join('~', 'AppData', 'Local'))
+    elif current_os == "Darwin":
+        base = os.path.expanduser(os.path.join('~', 'Library', 'Caches'))
+    else:
+        base = os.getenv('XDG_CACHE_HOME') or os.path.expanduser(os.path.join('~', '.cache'))
+    return os.path.join(base, 'flutter-github-manager')
+
+
+def path_mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except (OSError, TypeError):
+        return None
+
+
+def toolchain_fingerprint(package_versions=None):
+    # Changes whenever PATH, the resolved git/gh/python binaries or any
+    # import directory (pip installs touch site-packages) change
+    import hashlib
+    binaries = {name: shutil.which(name) for name in ('git', 'gh')}
+    binaries['python'] = sys.executable
+    fingerprint = {
+        'path': os.environ.get('PATH', ''),
+        'binaries': {name: [resolved, path_mtime(resolved)] for name, resolved in binaries.items()},
+        'import_dirs': [[entry, path_mtime(entry)] for entry in sys.path if entry and os.path.isdir(entry)],
+        'packages': sorted(package_versions or {}),
+    }
+    return hashlib.sha256(json.dumps(fingerprint, sort_keys=True).encode()).hexdigest()
+
+
+def toolchain_cache_path():
+    return os.path.join(get_user_cache_dir(), 'toolchain.json')
+
+
+def load_toolchain_cache(fingerprint, ttl=TOOLCHAIN_CACHE_TTL):
+    try:
+        with open(toolchain_cache_path(), 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return cached.get('fingerprint') == fingerprint and time.time() - cached.get('checked_at', 0) < ttl
 
 
-def get_workflow_yaml(platforms, ipa_name, apk_name, branch):
-    yaml_content = f"""
-    name: Build
-
-    on:
-      workflow_dispatch:
-
-    permissions:
-      contents: write
-
-    jobs:
-    """
-    for platform in platforms:
-        if platform.lower() == 'ios':
-            yaml_content += f"""
-      build-ios:
-        name: iOS Build
-        runs-on: macos-latest
-        steps:
-          - uses: actions/checkout@v3
-          - uses: subosito/flutter-action@v2
-            with:
-              channel: 'stable'
-              architecture: x64
-          - run: flutter config --no-analytics
-          - run: flutter pub get
-          - run: pod repo update
-            working-directory: ios
-          - run: flutter build ios --release --no-codesign --verbose
-          - name: Verify Build Output
-            run: ls -la build/ios/iphoneos
-          - run: mkdir Payload
-            working-directory: build/ios/iphoneos
-          - run: mv Runner.app Payload
-            working-directory: build/ios/iphoneos
-          - name: Zip output
-            run: zip -qq -r -9 {ipa_name} Payload
-            working-directory: build/ios/iphoneos
-          - name: Upload binaries to release
-            uses: svenstaro/upload-release-action@v2
-            with:
-              repo_token: ${{{{ secrets.GITHUB_TOKEN }}}}
-              file: build/ios/iphoneos/{ipa_name}
-              tag: v1.0
-              overwrite: true
-              body: "This is the first release"
-    """
-        elif platform.lower() == 'android':
-            yaml_content += f"""
-      build-android:
-        name: Android Build
-        runs-on: ubuntu-latest
-        steps:
-          - uses: actions/checkout@v3
-          - uses: subosito/flutter-action@v2
-            with:
-              channel: 'stable'
-              architecture: x64
-          - run: flutter pub get
-          - run: flutter build apk --release --verbose
-          - name: Upload APK to release
-            uses: svenstaro/upload-release-action@v2
-            with:
-              repo_token: ${{{{ secrets.GITHUB_TOKEN }}}}
-              file: build/app/outputs/flutter-apk/{apk_name}
-              tag: v1.0
-              overwrite: true
-              body: "This is the first release"
-    """
-    return textwrap.dedent(yaml_content)
-
-
-def check_and_install_dependencies(package_versions=None, verbose=False):
-    check_and_install_git(verbose=verbose)
-    check_and_install_gh(verbose=verbose)
-    install_python_packages(package_versions=package_versions, verbose=verbose)
+def save_toolchain_cache(fingerprint):
+    try:
+        os.makedirs(get_user_cache_dir(), exist_ok=True)
+        with open(toolchain_cache_path(), 'w', encoding='utf-8') as f:
+            json.dump({'fingerprint': fingerprint, 'checked_at': time.time()}, f)
+    except OSError:
+        pass
+
+
+def check_and_install_dependencies(package_versions=None, verbose=False, use_cache=True):
+    if use_cache and load_toolchain_cache(toolchain_fingerprint(package_versions)):
+        print(Fore.GREEN + "Toolchain unchanged since the last check. Skipping dependency probes.")
+        return
+    plan = plan_dependency_installation(package_versions=package_versions, verbose=verbose)
+    execute_install_plan(plan, verbose=verbose)
+    # Installs above may have changed the toolchain, so fingerprint it afterwards
+    save_toolchain_cache(toolchain_fingerprint(package_versions))
 
 
 def delete_old_workflow_runs(repo, github_token, verbose=False):
+    from github import Github, GithubException
     print(Fore.YELLOW + "Deleting old workflow runs...")
     g = Github(github_token)
     user = g.get_user()
@@ -637,31 +1706,111 @@ def delete_old_workflow_runs(repo, github_token, verbose=False):
     print(Fore.GREEN + "All old workflow runs attempted to be deleted.")
 
 
-def cache_dependencies(project_path, cache_dir, verbose=False):
+def open_cache_store(quota=None):
+    from cache_store import DEFAULT_QUOTA, CacheStore
+    return CacheStore(os.path.join(get_user_cache_dir(), 'store'), quota=quota or DEFAULT_QUOTA)
+
+
+def dependency_artifacts_current(project_path, kind):
+    # Artifacts are filed under the lockfile hash, so only store them once they were
+    # resolved from that lockfile and not left over from before a pull or checkout
+    if kind == 'pub':
+        try:
+            return (os.path.getmtime(os.path.join(project_path, '.dart_tool', 'package_config.json'))
+                    > os.path.getmtime(os.path.join(project_path, 'pubspec.lock')))
+        except OSError:
+            return False
+    if kind == 'pods':
+        try:
+            with open(os.path.join(project_path, 'ios', 'Pods', 'Manifest.lock'), 'rb') as manifest, \
+                    open(os.path.join(project_path, 'ios', 'Podfile.lock'), 'rb') as lockfile:
+                return manifest.read() == lockfile.read()
+        except OSError:
+            return False
+    return True
+
+
+def cache_dependencies(project_path, store, verbose=False):
+    from cache_store import project_key
     print(Fore.YELLOW + "Caching dependencies...")
-    cache_path = os.path.join(cache_dir, 'flutter_packages')
-    if not os.path.exists(cache_path):
-        os.makedirs(cache_path, exist_ok=True)
-    src = os.path.join(project_path, 'pubspec.lock')
-    dest = os.path.join(cache_path, 'pubspec.lock')
-    if os.path.exists(src):
-        shutil.copy(src, dest)
+    project = project_key(project_path)
+    for kind, digest in dependency_hashes(project_path).items():
+        if store.has(project, kind, digest):
+            store.touch(project, kind, digest)
+            if verbose:
+                print(Fore.GREEN + f"{kind} dependencies already cached as {digest[:12]}.")
+            continue
+        if not dependency_artifacts_current(project_path, kind):
+            if verbose:
+                print(Fore.YELLOW + f"{kind} dependencies do not match the current lockfiles yet; not caching them.")
+            continue
+        store.put(project, kind, digest, project_path,
+                  dependency_lockfiles(project_path, kind) + DEPENDENCY_ARTIFACTS[kind])
         if verbose:
-            print(Fore.GREEN + f"Cached pubspec.lock to {dest}")
+            print(Fore.GREEN + f"Cached {kind} dependencies as {digest[:12]} for {project}.")
+    evicted = store.prune()
+    if evicted and verbose:
+        print(Fore.CYAN + f"Evicted {len(evicted)} least recently used cache entries to stay under the quota.")
     print(Fore.GREEN + "Dependencies cached.")
 
 
-def restore_cached_dependencies(project_path, cache_dir, verbose=False):
+def restore_cached_dependencies(project_path, store, verbose=False):
+    from cache_store import project_key
     print(Fore.YELLOW + "Restoring cached dependencies...")
-    cache_path = os.path.join(cache_dir, 'flutter_packages', 'pubspec.lock')
-    src = cache_path
-    dest = os.path.join(project_path, 'pubspec.lock')
-    if os.path.exists(src):
-        shutil.copy(src, dest)
-        if verbose:
-            print(Fore.GREEN + f"Restored pubspec.lock from {src}")
+    project = project_key(project_path)
+    restored = []
+    for kind, digest in dependency_hashes(project_path).items():
+        # Only artifacts that match the current lockfiles exactly are restored
+        missing = [path for path in DEPENDENCY_ARTIFACTS[kind] if not os.path.exists(os.path.join(project_path, path))]
+        if missing and store.restore(project, kind, digest, project_path, missing):
+            restored.append(kind)
+            if verbose:
+                print(Fore.GREEN + f"Restored {kind} dependencies ({digest[:12]}): {', '.join(missing)}")
+    if not restored:
+        print(Fore.YELLOW + "No cached dependencies restored.")
+    return restored
+
+
+def format_bytes(size):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"{size:.1f} {unit}" if unit != 'B' else f"{size} B"
+        size /= 1024
+
+
+def run_cache_command(args):
+    store = open_cache_store(int(args.cache_quota * 1024 * 1024))
+    try:
+        if args.cache_command == 'prune':
+            quota = int(args.quota * 1024 * 1024) if args.quota is not None else None
+            max_age = args.older_than * 24 * 60 * 60 if args.older_than is not None else None
+            before = store.disk_usage()
+            evicted = store.prune(quota=quota, max_age=max_age)
+            for project, kind, digest in evicted:
+                print(Fore.CYAN + f"Evicted {project} {kind} {digest[:12]}")
+            print(Fore.GREEN + f"Pruned {len(evicted)} entries, freed {format_bytes(before - store.disk_usage())}.")
+            return
+        stats = store.stats()
+        print(Fore.CYAN + f"Cache store: {stats['root']} (version {stats['version']})")
+        print(Fore.CYAN + f"  Entries: {stats['entries']} across {stats['projects']} project(s)")
+        for kind, count in sorted(stats['kinds'].items()):
+            print(Fore.CYAN + f"    {kind}: {count}")
+        print(Fore.CYAN + f"  Objects: {stats['objects']}")
+        print(Fore.CYAN + f"  Disk usage: {format_bytes(stats['disk_bytes'])} of {format_bytes(stats['quota_bytes'])} quota")
+        print(Fore.CYAN + f"  Saved by deduplication: {format_bytes(max(stats['logical_bytes'] - stats['disk_bytes'], 0))}")
+        if stats['oldest_use']:
+            print(Fore.CYAN + f"  Least recently used entry: {time.strftime('%Y-%m-%d %H:%M', time.localtime(stats['oldest_use']))}")
+    finally:
+        store.close()
+
+
+def report_command_timings(json_path=None):
+    if json_path:
+        with open(json_path, 'w', encoding='utf-8') as f:
+            f.write(summarize_command_records(as_json=True))
+        print(Fore.GREEN + f"Command timings written to '{json_path}'.")
     else:
-        print(Fore.YELLOW + "No cached dependencies found.")
+        print(Fore.CYAN + summarize_command_records())
 
 
 def interactive_wizard(args):
@@ -723,6 +1872,7 @@ def main():
     parser.add_argument('--action', '-a', choices=['createrepo', 'repo'], help="Action: 'createrepo' or 'repo'")
     parser.add_argument('--repo', '-r', type=str, help='GitHub repository name.')
     parser.add_argument('--ipa-name', type=str, default='FlutterIpaExport.ipa', help='Name of the IPA file.')
+    parser.add_argument('--ipa-compression', type=int, choices=range(10), default=9, metavar='0-9', help='zip level used to package the IPA; 0 stores without compression.')
     parser.add_argument('--apk-name', type=str, default='FlutterApkExport.apk', help='Name of the APK file.')
     parser.add_argument('--build-dir', type=str, default='builds', help='Directory to store builds.')
     parser.add_argument('--project-path', '-p', type=str, default='.', help='Path to Flutter project.')
@@ -734,10 +1884,37 @@ def main():
     parser.add_argument('--verbose', '-v', action='store_true', help='Verbose output.')
     parser.add_argument('--interactive', '-i', action='store_true', help='Run in interactive mode.')
     parser.add_argument('--branch', type=str, default='main', help='Branch name to use.')
+    parser.add_argument('--flutter-version', type=str, help='Flutter SDK version used by the workflow (default: FVM pin, else latest stable).')
+    parser.add_argument('--cocoapods', choices=sorted(COCOAPODS_STRATEGIES), default='cdn', help="How the iOS build resolves pods: 'cdn' installs from the CDN trunk and only updates specs when install fails.")
     parser.add_argument('--platforms', type=str, nargs='+', choices=['iOS', 'Android'], default=['iOS'], help='Platforms to build.')
+    parser.add_argument('--split-per-abi', action='store_true', help='Build one APK per ABI (arm64, arm, x64) in parallel jobs instead of one fat APK.')
+    parser.add_argument('--ios-runner', type=str, nargs='+', default=['macos-latest'], help='runs-on label(s) of the iOS job, e.g. macos-14 or self-hosted macOS ARM64.')
+    parser.add_argument('--android-runner', type=str, nargs='+', default=['ubuntu-latest'], help='runs-on label(s) of the Android job.')
+    parser.add_argument('--ios-arch', choices=['x64', 'arm64'], help='Flutter SDK architecture on the iOS runner (default: guessed from its labels).')
+    parser.add_argument('--android-arch', choices=['x64', 'arm64'], help='Flutter SDK architecture on the Android runner (default: guessed from its labels).')
+    parser.add_argument('--incremental-cache', action='store_true', help='Cache .dart_tool, build intermediates, the Gradle build cache and Xcode DerivedData between runs.')
+    parser.add_argument('--flavors', type=str, nargs='+', help='Build these flavors as parallel matrix jobs in one workflow run.')
+    parser.add_argument('--target', type=str, nargs='+', help="Entrypoint(s): one for all flavors (may contain '{flavor}') or one per flavor.")
     parser.add_argument('--include', type=str, nargs='+', help='File patterns to include.')
     parser.add_argument('--exclude', type=str, nargs='+', help='File patterns to exclude.')
     parser.add_argument('--remotes', type=str, nargs='+', help='Additional GitHub usernames for multiple remotes.')
+    parser.add_argument('--skip-preflight', action='store_true', help='Skip the local project checks that run before uploading.')
+    parser.add_argument('--skip-secret-scan', action='store_true', help='Skip the local secret scan before pushing.')
+    parser.add_argument('--refresh-probes', action='store_true', help='Ignore cached toolchain probe results and check dependencies again.')
+    parser.add_argument('--git-backend', choices=sorted(GIT_BACKENDS), default='subprocess', help='Git implementation used for staging and committing.')
+    parser.add_argument('--upload-mode', choices=['all', 'minimal'], default='all', help="'minimal' uploads only what pubspec.yaml and the selected platforms need.")
+    parser.add_argument('--lfs-threshold', type=float, help='Route staged files larger than this many MB through Git LFS.')
+    parser.add_argument('--timings', action='store_true', help='Print per-command timings sorted by duration at the end of the run.')
+    parser.add_argument('--timings-json', type=str, help='Write per-command timings as JSON to this file at the end of the run.')
+    parser.add_argument('--single-push', action='store_true', help='Commit and push the project and workflow together in one push.')
+    parser.add_argument('--cache-quota', type=float, default=2048, help='Disk quota of the shared dependency cache in MB.')
+    subparsers = parser.add_subparsers(dest='command')
+    cache_parser = subparsers.add_parser('cache', help='Inspect or prune the shared dependency cache.')
+    cache_subparsers = cache_parser.add_subparsers(dest='cache_command', required=True)
+    cache_subparsers.add_parser('stats', help='Show cache entries, disk usage and deduplication savings.')
+    prune_parser = cache_subparsers.add_parser('prune', help='Evict least recently used entries.')
+    prune_parser.add_argument('--quota', type=float, help='Evict until the cache fits in this many MB (default: --cache-quota).')
+    prune_parser.add_argument('--older-than', type=float, help='Also evict entries unused for this many days.')
 
     if len(sys.argv) == 1:
         parser.print_help()
@@ -745,6 +1922,10 @@ def main():
 
     args = parser.parse_args()
 
+    if args.command == 'cache':
+        run_cache_command(args)
+        return
+
     if args.interactive:
         interactive_wizard(args)
 
@@ -759,15 +1940,30 @@ def main():
     INCLUDE_PATTERNS = args.include
     EXCLUDE_PATTERNS = args.exclude
     REMOTES = args.remotes
+    FLAVORS = resolve_flavor_targets(args.flavors, args.target)
+    TARGET = None if FLAVORS else (args.target or [None])[0]
+    LFS_THRESHOLD = int(args.lfs_threshold * 1024 * 1024) if args.lfs_threshold else None
+
+    if args.timings or args.timings_json:
+        atexit.register(report_command_timings, args.timings_json)
 
     github_token = get_github_token(args)
 
+    set_command_stage('dependencies')
     if not args.skip_dependencies:
-        check_and_install_dependencies(verbose=args.verbose)
-        cache_dependencies(PROJECT_PATH, os.path.join(PROJECT_PATH, '.cache'), verbose=args.verbose)
+        package_versions = {'dulwich': 'dulwich'} if args.git_backend == 'dulwich' else None
+        check_and_install_dependencies(package_versions=package_versions, verbose=args.verbose,
+                                       use_cache=not args.refresh_probes)
+        store = open_cache_store(int(args.cache_quota * 1024 * 1024))
+        try:
+            restore_cached_dependencies(PROJECT_PATH, store, verbose=args.verbose)
+            cache_dependencies(PROJECT_PATH, store, verbose=args.verbose)
+        finally:
+            store.close()
     else:
         print(Fore.YELLOW + "Skipping dependency checks.")
 
+    from github import Github, GithubException
     g = Github(github_token)
     user = g.get_user()
 
@@ -778,6 +1974,25 @@ def main():
         print(Fore.RED + "Action is required. Use '--action createrepo' or '--action repo'.")
         sys.exit(1)
 
+    git_backend = get_git_backend(args.git_backend, PROJECT_PATH, verbose=args.verbose)
+    workflow_yaml = get_workflow_yaml(PLATFORMS, IPA_NAME, APK_NAME, BRANCH, lfs=bool(LFS_THRESHOLD) or uses_lfs(PROJECT_PATH),
+                                      dependency_hashes=dependency_hashes(PROJECT_PATH),
+                                      flutter_version=args.flutter_version or detect_flutter_version(PROJECT_PATH),
+                                      cocoapods_strategy=args.cocoapods, split_per_abi=args.split_per_abi,
+                                      flavors=FLAVORS, target=TARGET,
+                                      ios_runner=runner_labels(args.ios_runner),
+                                      android_runner=runner_labels(args.android_runner),
+                                      ios_architecture=args.ios_arch, android_architecture=args.android_arch,
+                                      build_timeout=BUILD_TIMEOUT, incremental_cache=args.incremental_cache,
+                                      ipa_compression=args.ipa_compression)
+    single_push = args.single_push and not args.skip_upload
+
+    if not args.skip_preflight:
+        run_preflight_check(PROJECT_PATH, PLATFORMS, IPA_NAME, APK_NAME, workflow_yaml,
+                            cocoapods_strategy=args.cocoapods, flavors=FLAVORS, target=TARGET,
+                            verbose=args.verbose)
+
+    set_command_stage('upload')
     if action == "createrepo":
         repo = create_repo(repo_name, github_token, verbose=args.verbose)
         set_workflow_permissions(repo_name, github_token, verbose=args.verbose)
@@ -794,6 +2009,12 @@ def main():
                 include_patterns=INCLUDE_PATTERNS,
                 exclude_patterns=EXCLUDE_PATTERNS,
                 remotes=REMOTES,
+                workflow_content=workflow_yaml if single_push else None,
+                secret_scan=not args.skip_secret_scan,
+                git_backend=git_backend,
+                lfs_threshold=LFS_THRESHOLD,
+                upload_mode=args.upload_mode,
+                platforms=PLATFORMS,
                 verbose=args.verbose
             )
         else:
@@ -819,21 +2040,36 @@ def main():
                 include_patterns=INCLUDE_PATTERNS,
                 exclude_patterns=EXCLUDE_PATTERNS,
                 remotes=REMOTES,
+                workflow_content=workflow_yaml if single_push else None,
+                secret_scan=not args.skip_secret_scan,
+                git_backend=git_backend,
+                lfs_threshold=LFS_THRESHOLD,
+                upload_mode=args.upload_mode,
+                platforms=PLATFORMS,
                 verbose=args.verbose
             )
         else:
             print(Fore.YELLOW + "Skipping project upload.")
 
-    workflow_yaml = get_workflow_yaml(PLATFORMS, IPA_NAME, APK_NAME, BRANCH)
-    add_github_actions_workflow(workflow_yaml, project_path=PROJECT_PATH, verbose=args.verbose)
+    set_command_stage('workflow')
+    if single_push:
+        print(Fore.GREEN + "Workflow was pushed together with the project.")
+    else:
+        add_github_actions_workflow(workflow_yaml, project_path=PROJECT_PATH, git_backend=git_backend, verbose=args.verbose)
 
+    set_command_stage('build')
     if not args.skip_build:
+        wait_for_workflow_registration(repo_name, github_token, BRANCH, workflow_yaml, verbose=args.verbose)
         trigger_workflow_dispatch(repo_name, github_token, BRANCH, verbose=args.verbose)
         wait_for_workflow_completion(repo, github_token, BUILD_TIMEOUT, POLL_INTERVAL, BRANCH, verbose=args.verbose)
-        if 'iOS' in PLATFORMS:
-            download_artifact(repo, IPA_NAME, BUILD_DIR, '.ipa', verbose=args.verbose)
-        if 'Android' in PLATFORMS:
-            download_artifact(repo, APK_NAME, BUILD_DIR, '.apk', verbose=args.verbose)
+        if FLAVORS or args.split_per_abi:
+            artifact_names = expected_artifact_names(PLATFORMS, IPA_NAME, APK_NAME, FLAVORS, args.split_per_abi)
+            download_artifacts(repo, artifact_names, BUILD_DIR, verbose=args.verbose)
+        else:
+            if 'iOS' in PLATFORMS:
+                download_artifact(repo, IPA_NAME, BUILD_DIR, '.ipa', verbose=args.verbose)
+            if 'Android' in PLATFORMS:
+                download_artifact(repo, APK_NAME, BUILD_DIR, '.apk', verbose=args.verbose)
     else:
         print(Fore.YELLOW + "Skipping build and download steps.")
 
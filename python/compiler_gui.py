@@ -5,11 +5,8 @@ import platform
 import shutil
 import os
 import textwrap
-import requests
-import zipfile
 import io
 import json
-import hashlib
 
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QTabWidget, QVBoxLayout, QFormLayout, 
@@ -19,11 +16,17 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import Qt, QThread, pyqtSignal
 from PyQt5.QtGui import QTextCursor  # Importiert QTextCursor für die Log-Funktion
 
+# requests and PyGithub are imported inside the helpers that use them so the
+# window can show before they load
 from colorama import init, Fore, Style
-from github import Github, GithubException
+
+from command_runner import clear_command_records, format_command_record, set_command_stage, stream_command, summarize_command_records
 
 init(autoreset=True)
 
+# Same marker as compiler.py: set in the environment of a process relaunched after installing packages
+RELAUNCH_ENV = 'FLUTTER_GITHUB_MANAGER_RELAUNCHED'
+
 # ================================
 # Helper Functions (Modified for GUI)
 # ================================
@@ -31,34 +34,18 @@ init(autoreset=True)
 def run_command(command, cwd=None, verbose=True, check=True, use_tqdm=False, progress_callback=None):
     if verbose and progress_callback:
         progress_callback(f"➤ Running command: {command}")
+    subscribers = []
+    if progress_callback and (verbose or use_tqdm):
+        subscribers.append(lambda line: progress_callback(line.strip()))
     try:
-        process = subprocess.Popen(
-            command,
-            cwd=cwd,
-            shell=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            text=True
-        )
-        stdout = ''
-        if use_tqdm and progress_callback:
-            for line in iter(process.stdout.readline, ''):
-                if line:
-                    stdout += line
-                    progress_callback(line.strip())
-        else:
-            while True:
-                line = process.stdout.readline()
-                if not line:
-                    break
-                stdout += line
-                if verbose and progress_callback:
-                    progress_callback(line.strip())
-        returncode = process.wait()
+        returncode, output, record = stream_command(command, cwd=cwd, subscribers=subscribers)
+        stdout = output.getvalue()
+        if verbose and progress_callback:
+            progress_callback(format_command_record(record))
         if returncode != 0 and check:
             if progress_callback:
                 progress_callback(f"Command '{command}' failed with return code {returncode}.")
-            raise subprocess.CalledProcessError(returncode, command)
+            raise subprocess.CalledProcessError(returncode, command, output=stdout)
         return returncode, stdout, ''
     except subprocess.CalledProcessError as e:
         if check:
@@ -94,13 +81,15 @@ def install_python_packages(package_versions=None, verbose=False, progress_callb
             if progress_callback:
                 progress_callback(f"Installing missing Python package: {package}")
             if sys.argv[0].endswith('.exe'):
+                if os.environ.get(RELAUNCH_ENV):
+                    raise Exception(f"{package} is still missing after relaunching. Install it with 'python -m pip install {spec}'.")
                 if progress_callback:
                     progress_callback(f"Running as .exe. Opening new Python window to install {package}...")
                 python_path = shutil.which("python") or "python"
                 open_new_window_and_run(f'{python_path} -m pip install {spec}', progress_callback)
                 if progress_callback:
                     progress_callback("Relaunching the script with the same arguments...")
-                subprocess.Popen([sys.executable] + sys.argv)
+                subprocess.Popen([sys.executable] + sys.argv, env={**os.environ, RELAUNCH_ENV: '1'})
                 raise SystemExit
             else:
                 run_command(f"{sys.executable} -m pip install {spec}", verbose=verbose, progress_callback=progress_callback)
@@ -216,6 +205,7 @@ def get_github_token(progress_callback=None):
     return token
 
 def create_repo(repo_name, github_token, verbose=False, progress_callback=None):
+    from github import Github, GithubException
     try:
         g = Github(github_token)
         user = g.get_user()
@@ -243,6 +233,7 @@ def create_repo(repo_name, github_token, verbose=False, progress_callback=None):
         raise Exception(e.data.get('message', 'Unknown error'))
 
 def get_github_username(github_token, progress_callback=None):
+    from github import Github, GithubException
     try:
         g = Github(github_token)
         user = g.get_user()
@@ -254,6 +245,7 @@ def get_github_username(github_token, progress_callback=None):
 
 def upload_project(repo_name, github_token, project_path, branch, ipa_name, apk_name,
                   include_patterns=None, exclude_patterns=None, remotes=None, verbose=False, progress_callback=None):
+    import hashlib
     try:
         if not os.path.isdir(os.path.join(project_path, ".git")):
             if progress_callback:
@@ -384,6 +376,7 @@ def add_github_actions_workflow(workflow_content, project_path, verbose=False, p
         raise e
 
 def set_workflow_permissions(repo_name, github_token, verbose=False, progress_callback=None):
+    import requests
     try:
         if progress_callback:
             progress_callback("Setting GitHub Actions permissions to 'Read and write'...")
@@ -414,6 +407,7 @@ def set_workflow_permissions(repo_name, github_token, verbose=False, progress_ca
         raise e
 
 def trigger_workflow_dispatch(repo_name, github_token, branch, verbose=False, progress_callback=None):
+    import requests
     try:
         if progress_callback:
             progress_callback("Triggering GitHub Actions workflow via API...")
@@ -438,6 +432,7 @@ def trigger_workflow_dispatch(repo_name, github_token, branch, verbose=False, pr
         raise e
 
 def wait_for_workflow_completion(repo, github_token, build_timeout, poll_interval, branch, verbose=False, progress_callback=None):
+    from github import Github
     try:
         g = Github(github_token)
         user = g.get_user()
@@ -505,6 +500,8 @@ def wait_for_workflow_completion(repo, github_token, build_timeout, poll_interva
         raise e
 
 def download_and_display_workflow_logs(repository, run_id, github_token, progress_callback=None):
+    import zipfile
+    import requests
     try:
         if progress_callback:
             progress_callback("Downloading workflow logs...")
@@ -532,6 +529,7 @@ def download_and_display_workflow_logs(repository, run_id, github_token, progres
         raise e
 
 def download_artifact(repo, artifact_name, builds_dir, file_extension, verbose=False, progress_callback=None):
+    import requests
     try:
         if progress_callback:
             progress_callback(f"Fetching the latest release for {file_extension.upper()}...")
@@ -649,6 +647,7 @@ def check_and_install_dependencies(package_versions=None, verbose=False, progres
     install_python_packages(package_versions=package_versions, verbose=verbose, progress_callback=progress_callback)
 
 def delete_old_workflow_runs(repo, github_token, verbose=False, progress_callback=None):
+    from github import Github, GithubException
     try:
         if progress_callback:
             progress_callback("Deleting old workflow runs...")
@@ -941,8 +940,12 @@ class App(QWidget):
     def build_process(self, token, repo_name, project_path, ipa_name, apk_name, 
                      build_dir, branch, platforms, verbose,
                      include_patterns, exclude_patterns, remotes, action, progress_callback):
+        from github import Github, GithubException
+        # Each build reports only its own commands
+        clear_command_records()
         try:
             # Check and install dependencies
+            set_command_stage('dependencies')
             progress_callback("Checking and installing dependencies...")
             check_and_install_dependencies(verbose=verbose, progress_callback=progress_callback)
 
@@ -981,6 +984,7 @@ class App(QWidget):
             delete_old_workflow_runs(repo, token, verbose=verbose, progress_callback=progress_callback)
 
             # Upload Project
+            set_command_stage('upload')
             progress_callback("Uploading project to GitHub...")
             upload_project(
                 repo_name,
@@ -997,12 +1001,14 @@ class App(QWidget):
             )
 
             # Add GitHub Actions Workflow
+            set_command_stage('workflow')
             progress_callback("Adding GitHub Actions workflow...")
             platform_list = [p.strip() for p in platforms.split(',')]
             workflow_yaml = get_workflow_yaml(platform_list, ipa_name, apk_name, branch)
             add_github_actions_workflow(workflow_yaml, project_path=project_path, verbose=verbose, progress_callback=progress_callback)
 
             # Trigger Workflow
+            set_command_stage('build')
             progress_callback("Triggering GitHub Actions workflow...")
             trigger_workflow_dispatch(repo_name, token, branch, verbose=verbose, progress_callback=progress_callback)
 
@@ -1022,6 +1028,9 @@ class App(QWidget):
         except Exception as e:
             progress_callback(str(e))
             raise e
+        finally:
+            if verbose:
+                progress_callback(summarize_command_records())
 
     # ================================
     # Handle Application Closure
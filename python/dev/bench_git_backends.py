@@ -0,0 +1,92 @@
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compiler import GIT_BACKENDS, get_git_backend  # noqa: E402
+
+
+def generate_flutter_project(path, dart_files, asset_files, asset_size):
+    for i in range(dart_files):
+        package_dir = os.path.join(path, 'lib', f'feature_{i % 50}')
+        os.makedirs(package_dir, exist_ok=True)
+        with open(os.path.join(package_dir, f'widget_{i}.dart'), 'w', encoding='utf-8') as f:
+            f.write(f"import 'package:flutter/material.dart';\n\nclass Widget{i} extends StatelessWidget {{\n")
+            f.write("  @override\n  Widget build(BuildContext context) => const Placeholder();\n}\n" * 20)
+    os.makedirs(os.path.join(path, 'assets', 'images'), exist_ok=True)
+    for i in range(asset_files):
+        with open(os.path.join(path, 'assets', 'images', f'image_{i}.png'), 'wb') as f:
+            f.write(os.urandom(asset_size))
+    for folder in ('ios/Runner', 'android/app/src/main'):
+        os.makedirs(os.path.join(path, folder), exist_ok=True)
+    with open(os.path.join(path, 'pubspec.yaml'), 'w', encoding='utf-8') as f:
+        f.write("name: bench_app\nflutter:\n  assets:\n    - assets/images/\n")
+
+
+def touch_files(path, count):
+    touched = 0
+    for root, _, files in os.walk(os.path.join(path, 'lib')):
+        for name in files:
+            if touched >= count:
+                return
+            with open(os.path.join(root, name), 'a', encoding='utf-8') as f:
+                f.write('// changed\n')
+            touched += 1
+
+
+def bench_backend(name, source, workdir, touched):
+    project = os.path.join(workdir, name)
+    shutil.copytree(source, project, ignore=shutil.ignore_patterns('.git'))
+    backend = get_git_backend(name, project, verbose=False)
+    timings = {}
+
+    start = time.perf_counter()
+    backend.init()
+    backend.add_remote('origin_bench', 'https://github.com/example/bench.git')
+    backend.add(['.'])
+    backend.commit('Initial commit')
+    backend.rename_branch('main')
+    timings['initial'] = time.perf_counter() - start
+
+    touch_files(project, touched)
+    start = time.perf_counter()
+    backend.add(['.'])
+    backend.commit('Update')
+    timings['incremental'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    backend.add(['.'])
+    backend.commit('Noop')
+    timings['unchanged'] = time.perf_counter() - start
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare git backends on staging and committing a large Flutter project.")
+    parser.add_argument('--project', type=str, help='Existing Flutter project to copy instead of a generated one.')
+    parser.add_argument('--dart-files', type=int, default=5000, help='Number of generated Dart files.')
+    parser.add_argument('--asset-files', type=int, default=200, help='Number of generated binary assets.')
+    parser.add_argument('--asset-size', type=int, default=256 * 1024, help='Size of each generated asset in bytes.')
+    parser.add_argument('--touched', type=int, default=50, help='Files changed before the incremental commit.')
+    parser.add_argument('--backends', type=str, nargs='+', choices=sorted(GIT_BACKENDS), default=sorted(GIT_BACKENDS))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        source = args.project
+        if not source:
+            source = os.path.join(workdir, 'source')
+            generate_flutter_project(source, args.dart_files, args.asset_files, args.asset_size)
+
+        results = {name: bench_backend(name, source, workdir, args.touched) for name in args.backends}
+
+    print(f"{'backend':<12}{'initial':>12}{'incremental':>14}{'unchanged':>12}")
+    for name, timings in results.items():
+        print(f"{name:<12}{timings['initial']:>11.2f}s{timings['incremental']:>13.2f}s{timings['unchanged']:>11.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+
+
+def write_mixed_binary(path, size, compressible_ratio):
+    # Mach-O code and data compress partially: mix random bytes with repeated runs
+    compressible = int(size * compressible_ratio)
+    pattern = bytes(range(256)) * 16
+    with open(path, 'wb') as f:
+        f.write(os.urandom(size - compressible))
+        f.write((pattern * (compressible // len(pattern) + 1))[:compressible])
+
+
+def generate_payload(path, binary_size, asset_files, asset_size):
+    app = os.path.join(path, 'Payload', 'Runner.app')
+    frameworks = os.path.join(app, 'Frameworks')
+    os.makedirs(os.path.join(frameworks, 'App.framework'), exist_ok=True)
+    os.makedirs(os.path.join(frameworks, 'Flutter.framework'), exist_ok=True)
+    write_mixed_binary(os.path.join(app, 'Runner'), binary_size // 8, 0.5)
+    write_mixed_binary(os.path.join(frameworks, 'App.framework', 'App'), binary_size // 2, 0.4)
+    write_mixed_binary(os.path.join(frameworks, 'Flutter.framework', 'Flutter'), binary_size, 0.4)
+    assets = os.path.join(frameworks, 'App.framework', 'flutter_assets', 'assets')
+    os.makedirs(assets, exist_ok=True)
+    for i in range(asset_files):
+        # PNG and JPEG data is already compressed
+        with open(os.path.join(assets, f'image_{i}.png'), 'wb') as f:
+            f.write(os.urandom(asset_size))
+    with open(os.path.join(app, 'Info.plist'), 'w', encoding='utf-8') as f:
+        f.write('<plist><dict>' + '<key>Key</key><string>Value</string>' * 500 + '</dict></plist>\n')
+    return os.path.join(path, 'Payload')
+
+
+def package_with_zip(payload_dir, archive, level):
+    subprocess.run(['zip', '-qq', '-r', f'-{level}', archive, 'Payload'],
+                   cwd=os.path.dirname(payload_dir), check=True)
+
+
+def package_with_zipfile(payload_dir, archive, level):
+    compression = zipfile.ZIP_STORED if level == 0 else zipfile.ZIP_DEFLATED
+    root = os.path.dirname(payload_dir)
+    with zipfile.ZipFile(archive, 'w', compression=compression, compresslevel=level or None) as zf:
+        for dirpath, _, filenames in os.walk(payload_dir):
+            for name in filenames:
+                full_path = os.path.join(dirpath, name)
+                zf.write(full_path, os.path.relpath(full_path, root))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare IPA packaging time against archive size per zip level.")
+    parser.add_argument('--payload', type=str, help='Existing Payload directory (e.g. build/ios/iphoneos/Payload) instead of a generated one.')
+    parser.add_argument('--binary-size', type=int, default=60 * 1024 * 1024, help='Size of the generated Flutter framework binary in bytes.')
+    parser.add_argument('--asset-files', type=int, default=100, help='Number of generated image assets.')
+    parser.add_argument('--asset-size', type=int, default=200 * 1024, help='Size of each generated asset in bytes.')
+    parser.add_argument('--levels', type=int, nargs='+', default=[0, 1, 3, 6, 9], help='zip levels to compare; 0 is stored.')
+    parser.add_argument('--bandwidth', type=float, default=50, help='Download bandwidth in Mbit/s used to estimate total time.')
+    parser.add_argument('--runs', type=int, default=3, help='Runs per level; the fastest one counts.')
+    args = parser.parse_args()
+
+    package = package_with_zip if shutil.which('zip') else package_with_zipfile
+    print(f"Packaging with {'the zip command' if package is package_with_zip else 'Python zipfile (zip not found)'}")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        payload = os.path.abspath(args.payload) if args.payload else generate_payload(
+            workdir, args.binary_size, args.asset_files, args.asset_size)
+        results = []
+        for level in args.levels:
+            archive = os.path.join(workdir, f'level_{level}.ipa')
+            best = None
+            for _ in range(args.runs):
+                if os.path.exists(archive):
+                    os.remove(archive)
+                start = time.perf_counter()
+                package(payload, archive, level)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            size = os.path.getsize(archive)
+            download = size * 8 / (args.bandwidth * 1000 * 1000)
+            results.append((level, best, size, download))
+
+    print(f"{'level':<8}{'package':>10}{'size':>12}{'download':>11}{'total':>10}")
+    for level, elapsed, size, download in results:
+        print(f"{level:<8}{elapsed:>9.2f}s{size / (1024 * 1024):>9.1f} MB{download:>10.2f}s{elapsed + download:>9.2f}s")
+    fastest = min(results, key=lambda r: r[1] + r[3])
+    print(f"Fastest package + download at {args.bandwidth:g} Mbit/s: level {fastest[0]}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+import argparse
+import json
+import math
+import os
+import subprocess
+import sys
+import time
+
+DEV_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(DEV_DIR)
+BUDGET_FILE = os.path.join(DEV_DIR, 'startup_budget.json')
+BUDGET_HEADROOM = 1.25
+TARGETS = {
+    'import compiler': ['-c', 'import compiler'],
+    'import compiler_gui': ['-c', 'import compiler_gui'],
+    'compiler.py --help': ['compiler.py', '--help'],
+}
+BARE_STARTUP = ['-c', 'pass']
+# Packages only the commands that need them may import
+DEFAULT_DEFERRED = ['cache_store', 'dulwich', 'github', 'requests', 'tqdm', 'workflow_model', 'yaml']
+
+
+def parse_importtime(stderr):
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        entries.append((int(self_us), int(cumulative_us), name.rstrip()))
+    return entries
+
+
+def run_importtime(args):
+    result = subprocess.run([sys.executable, '-X', 'importtime'] + args, cwd=ROOT_DIR, capture_output=True, text=True)
+    if result.returncode != 0:
+        return None, result.stderr.strip().splitlines()[-1]
+    return parse_importtime(result.stderr), None
+
+
+def measure_command(args, runs):
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + args, cwd=ROOT_DIR, capture_output=True)
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def load_budget():
+    try:
+        with open(BUDGET_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {'deferred': DEFAULT_DEFERRED}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check cold start against the budget of imported modules.")
+    parser.add_argument('--runs', type=int, default=5, help='Timing runs per target; the fastest one counts.')
+    parser.add_argument('--top', type=int, default=10, help='Number of slowest imports to list per target.')
+    parser.add_argument('--write-budget', action='store_true', help='Store the current module counts plus headroom as the new budget.')
+    args = parser.parse_args()
+
+    # Module counts do not depend on machine load like wall time does, and
+    # modules the interpreter loads anyway (site, .pth hooks) are not counted
+    bare_entries, _ = run_importtime(BARE_STARTUP)
+    bare_modules = {name.strip() for _, _, name in bare_entries}
+    bare_ms = measure_command(BARE_STARTUP, args.runs)
+    budget = load_budget()
+    deferred = budget.get('deferred', DEFAULT_DEFERRED)
+
+    measurements = {}
+    problems = []
+    for target, command in TARGETS.items():
+        entries, error = run_importtime(command)
+        if entries is None:
+            print(f"{target}: skipped ({error})")
+            continue
+        entries = [entry for entry in entries if entry[2].strip() not in bare_modules]
+        modules = {name.strip() for _, _, name in entries}
+        measurements[target] = len(modules)
+        elapsed = measure_command(command, args.runs)
+        print(f"{target}: {len(modules)} modules, {elapsed:.1f} ms ({elapsed / bare_ms:.1f}x bare interpreter)")
+        for self_us, cumulative_us, name in sorted(entries, key=lambda e: e[0], reverse=True)[:args.top]:
+            print(f"    {self_us / 1000:7.1f} ms self {cumulative_us / 1000:7.1f} ms cumulative  {name.strip()}")
+        loaded = sorted({module.split('.')[0] for module in modules} & set(deferred))
+        if loaded:
+            problems.append(f"{target} imports {', '.join(loaded)}, which should load lazily")
+
+    if args.write_budget:
+        budget = {**{target: budget[target] for target in TARGETS if target in budget},
+                  **{target: math.ceil(count * BUDGET_HEADROOM) for target, count in measurements.items()},
+                  'deferred': deferred}
+        with open(BUDGET_FILE, 'w', encoding='utf-8') as f:
+            json.dump(budget, f, indent=2)
+            f.write('\n')
+        print(f"Budget written to {BUDGET_FILE}")
+    else:
+        problems.extend(f"Over budget: {target} imports {count} modules (budget {budget[target]})"
+                        for target, count in measurements.items() if target in budget and count > budget[target])
+    for problem in problems:
+        print(problem)
+    if problems:
+        sys.exit(1)
+    print("Startup within budget.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Union
+
+import yaml
+
+JOB_ID = re.compile(r'^[A-Za-z_][A-Za-z0-9_-]*$')
+MATRIX_REFERENCE = re.compile(r'\$\{\{\s*matrix\.([A-Za-z0-9_-]+)\s*\}\}')
+# Long commands stay on one line instead of being folded
+YAML_LINE_WIDTH = 4096
+
+
+class WorkflowError(ValueError):
+    pass
+
+
+@dataclass
+class Step:
+    name: Optional[str] = None
+    uses: Optional[str] = None
+    run: Optional[str] = None
+    working_directory: Optional[str] = None
+    with_: Dict[str, Union[str, bool, int]] = field(default_factory=dict)
+
+    def to_dict(self):
+        data = {}
+        for key, value in (('name', self.name), ('uses', self.uses), ('with', self.with_), ('run', self.run),
+                           ('working-directory', self.working_directory)):
+            if value:
+                data[key] = value
+        return data
+
+
+@dataclass
+class Job:
+    id: str
+    name: str
+    runs_on: Union[str, List[str]]
+    steps: List[Step] = field(default_factory=list)
+    matrix: List[Dict[str, str]] = field(default_factory=list)
+    timeout_minutes: Optional[int] = None
+
+    def to_dict(self):
+        data = {'name': self.name, 'runs-on': self.runs_on}
+        if self.timeout_minutes:
+            data['timeout-minutes'] = self.timeout_minutes
+        if self.matrix:
+            data['strategy'] = {'fail-fast': False, 'matrix': {'include': self.matrix}}
+        data['steps'] = [step.to_dict() for step in self.steps]
+        return data
+
+
+@dataclass
+class Workflow:
+    name: str
+    jobs: List[Job] = field(default_factory=list)
+    permissions: Dict[str, str] = field(default_factory=lambda: {'contents': 'write'})
+    concurrency: Optional[Dict[str, Union[str, bool]]] = None
+
+    def to_dict(self):
+        data = {'name': self.name, 'on': {'workflow_dispatch': None}, 'permissions': self.permissions}
+        if self.concurrency:
+            data['concurrency'] = self.concurrency
+        data['jobs'] = {job.id: job.to_dict() for job in self.jobs}
+        return data
+
+    def validate(self):
+        errors = []
+        job_ids = [job.id for job in self.jobs]
+        if not self.jobs:
+            errors.append("workflow has no jobs")
+        for job_id in sorted({job_id for job_id in job_ids if job_ids.count(job_id) > 1}):
+            errors.append(f"job id '{job_id}' is used more than once")
+        for job in self.jobs:
+            errors.extend(f"job '{job.id}': {error}" for error in validate_job(job))
+        if errors:
+            raise WorkflowError("Invalid workflow:\n  " + "\n  ".join(errors))
+        return self
+
+    def to_yaml(self):
+        return dump_yaml(self.validate().to_dict())
+
+
+def validate_job(job):
+    errors = []
+    if not JOB_ID.match(job.id):
+        errors.append("id must start with a letter or '_' and contain only letters, digits, '-' and '_'")
+    if not job.runs_on or (isinstance(job.runs_on, list) and not all(job.runs_on)):
+        errors.append("runs-on is empty")
+    if not job.steps:
+        errors.append("has no steps")
+    if job.matrix and len({tuple(entry) for entry in job.matrix}) != 1:
+        errors.append("matrix entries must all have the same keys")
+    matrix_keys = set(job.matrix[0]) if job.matrix else set()
+    for index, step in enumerate(job.steps, 1):
+        if bool(step.uses) == bool(step.run):
+            errors.append(f"step {index} needs exactly one of 'uses' and 'run'")
+        if step.with_ and not step.uses:
+            errors.append(f"step {index} has 'with' inputs but no action")
+        if step.working_directory and not step.run:
+            errors.append(f"step {index} has a working directory but no command")
+    for text in [job.name] + [dump_yaml(step.to_dict()) for step in job.steps]:
+        if text.count('${{') != text.count('}}'):
+            errors.append(f"unbalanced expression in {text.splitlines()[0]!r}")
+        for key in MATRIX_REFERENCE.findall(text):
+            if key not in matrix_keys:
+                errors.append(f"references matrix.{key}, which the matrix does not define")
+    return sorted(set(errors), key=errors.index)
+
+
+class WorkflowDumper(yaml.SafeDumper):
+    # Indents block sequences under their key, the layout GitHub's own examples use
+    def increase_indent(self, flow=False, indentless=False):
+        return super().increase_indent(flow, False)
+
+    def ignore_aliases(self, data):
+        # Jobs share step objects; repeat them instead of emitting anchors
+        return True
+
+
+def represent_str(dumper, value):
+    # Multi-line commands stay readable as literal blocks
+    return dumper.represent_scalar('tag:yaml.org,2002:str', value, style='|' if '\n' in value else None)
+
+
+def represent_none(dumper, value):
+    return dumper.represent_scalar('tag:yaml.org,2002:null', '')
+
+
+WorkflowDumper.add_representer(str, represent_str)
+WorkflowDumper.add_representer(type(None), represent_none)
+
+
+def dump_yaml(value):
+    return yaml.dump(value, Dumper=WorkflowDumper, sort_keys=False, default_flow_style=False,
+                     allow_unicode=True, width=YAML_LINE_WIDTH)